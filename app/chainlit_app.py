@@ -4,7 +4,12 @@ This is the main entry point for the interactive chat interface.
 """
 
 import asyncio
+import hashlib
+import json
+import os
+import shutil
 import sys
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional
 
@@ -14,12 +19,18 @@ sys.path.insert(0, str(project_root))
 
 import chainlit as cl
 
+# orjson is an optional accelerator - fall back to stdlib json when absent
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from src.agents.agent import EducationalDocumentAgent
 from src.chains.qa_chain import QAChain
 from src.chains.routing_chain import QueryRouter, QueryType
 from src.config.settings import settings
 from src.document_processing.loaders import DocumentLoader
-from src.document_processing.metadata import extract_metadata_from_documents
+from src.document_processing.metadata import get_extractor
 from src.document_processing.splitters import DocumentSplitter
 from src.memory.conversation_memory import get_memory_manager
 from src.retrieval.vector_store import VectorStoreManager
@@ -28,37 +39,46 @@ from src.utils.logging import get_logger
 logger = get_logger(__name__)
 
 
-# Global variables
-vector_store_manager: Optional[VectorStoreManager] = None
-qa_chain: Optional[QAChain] = None
-query_router: Optional[QueryRouter] = None
-agent: Optional[EducationalDocumentAgent] = None
+# Shared splitter - construction reads settings and configures separators,
+# so build it once at import instead of per upload
+_SPLITTER = DocumentSplitter()
 
+# Bound concurrent file processing so a multi-file drop doesn't hold every
+# PDF in flight at once or trip embedding-API rate limits
+_UPLOAD_SEM = asyncio.Semaphore(settings.upload_concurrency)
 
-@cl.on_chat_start
-async def start():
-    """Initialize the chat session."""
-    global vector_store_manager, qa_chain, query_router, agent
+# Routing decisions for repeated prompts - routing makes its own LLM call,
+# so a hit here removes a full classification round trip (LRU, 512 entries)
+_ROUTE_CACHE: OrderedDict = OrderedDict()
+_ROUTE_CACHE_MAX = 512
 
-    # Get or create session ID
-    session_id = cl.user_session.get("id")
-    logger.info(f"Starting new chat session: {session_id}")
 
-    # Initialize conversation memory for this session
-    memory_manager = get_memory_manager()
-    session_memory = memory_manager.get_or_create_session(
-        session_id=session_id,
-        memory_type="buffer",  # Use buffer for now; could switch to summary for long conversations
-        max_token_limit=2000,
-    )
-    cl.user_session.set("memory", session_memory)
+# Content hashes of chunks already embedded, persisted across restarts so
+# re-uploading the same file doesn't re-embed and re-index every chunk
+_HASH_CACHE_PATH = Path("data/.embed_cache/hashes.json")
 
-    # Initialize query router
-    query_router = QueryRouter()
 
-    # Welcome message
-    await cl.Message(
-        content=f"""# Welcome to {settings.app_name}! 📚
+def _load_seen_hashes() -> set:
+    """Load the set of content hashes already embedded."""
+    try:
+        raw = _HASH_CACHE_PATH.read_bytes()
+        return set(orjson.loads(raw) if orjson else json.loads(raw))
+    except (FileNotFoundError, ValueError):
+        return set()
+
+
+def _save_seen_hashes(hashes: set) -> None:
+    """Persist the set of embedded content hashes."""
+    _HASH_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    data = sorted(hashes)
+    if orjson:
+        _HASH_CACHE_PATH.write_bytes(orjson.dumps(data))
+    else:
+        _HASH_CACHE_PATH.write_text(json.dumps(data), encoding="utf-8")
+
+
+# Welcome markdown, rendered once at import instead of per session
+_WELCOME = f"""# Welcome to {settings.app_name}! 📚
 
 I'm your AI assistant for educational documents. Here's how I can help:
 
@@ -80,16 +100,151 @@ I'm your AI assistant for educational documents. Here's how I can help:
 
 Ready to begin? Upload your first document! 📄
 """
-    ).send()
 
-    # Try to load existing vector store
+
+def _preload() -> Optional[VectorStoreManager]:
+    """Load the persisted vector store once at import.
+
+    Loading the collection is the expensive part of session startup;
+    doing it at import means every chat session (including the first)
+    only pays an O(1) lookup in on_chat_start.
+
+    Returns:
+        Optional[VectorStoreManager]: Loaded manager, or None if no
+            vector store has been persisted yet
+    """
     try:
-        vector_store_manager = VectorStoreManager()
-        vector_store_manager.load_vector_store()
-        qa_chain = QAChain(vector_store_manager)
+        manager = VectorStoreManager()
+        manager.load_vector_store()
+        logger.info("Preloaded existing vector store at import")
+        return manager
+    except FileNotFoundError:
+        logger.info("No existing vector store found at import")
+        return None
+    except Exception as e:
+        logger.error(f"Error preloading vector store: {e}")
+        return None
+
+
+# Shared vector store manager - the document collection is process-wide,
+# while per-session objects (QA chain, router, agent) live in
+# cl.user_session so concurrent users don't share LLM client state
+vector_store_manager: Optional[VectorStoreManager] = _preload()
+
+
+async def _batched(aiter, max_chars: int = 64, max_delay_ms: int = 25):
+    """Coalesce streamed tokens into bounded batches.
+
+    Calling ``msg.stream_token`` once per LLM token crosses Chainlit's
+    websocket send path for every token, and the per-frame overhead
+    dominates at high token rates. Batching tokens by size (``max_chars``)
+    with a small flush timeout (``max_delay_ms``) keeps the UI responsive
+    while cutting the number of frames by an order of magnitude.
+
+    Args:
+        aiter: Async iterator yielding string tokens
+        max_chars: Flush the batch once its joined length reaches this size
+        max_delay_ms: Flush a non-empty batch after this many milliseconds
+
+    Yields:
+        str: Joined token batches
+    """
+    buffer: list[str] = []
+    buffered_len = 0
+    timeout = max_delay_ms / 1000
+    next_token = None
+
+    while True:
+        if next_token is None:
+            next_token = asyncio.ensure_future(anext(aiter))
+
+        # If we have buffered tokens, wait with a timeout so a slow
+        # producer doesn't delay what we've already accumulated
+        if buffer:
+            done, _ = await asyncio.wait({next_token}, timeout=timeout)
+            if not done:
+                yield "".join(buffer)
+                buffer.clear()
+                buffered_len = 0
+                continue
+
+        try:
+            token = await next_token
+        except StopAsyncIteration:
+            break
+        next_token = None
+
+        buffer.append(token)
+        buffered_len += len(token)
+
+        if buffered_len >= max_chars:
+            yield "".join(buffer)
+            buffer.clear()
+            buffered_len = 0
+
+    if buffer:
+        yield "".join(buffer)
+
+
+def _extract_token(event) -> Optional[str]:
+    """Pull displayable text out of a LangGraph agent stream event.
+
+    Agent events are state-update dicts keyed by graph node; the "agent"
+    node carries the assistant messages we want to surface. Tool events
+    are skipped so intermediate machinery isn't shown to the user.
+
+    Args:
+        event: Event dict yielded by EducationalDocumentAgent.astream
+
+    Returns:
+        Optional[str]: Text to stream, or None if the event has none
+    """
+    if not isinstance(event, dict):
+        return None
+
+    # Error events from the agent surface a plain "output" key
+    if "output" in event:
+        return event["output"]
+
+    messages = event.get("agent", {}).get("messages", [])
+    if messages:
+        content = getattr(messages[-1], "content", None)
+        if isinstance(content, str) and content:
+            return content
+
+    return None
+
+
+@cl.on_chat_start
+async def start():
+    """Initialize the chat session."""
+    # Get or create session ID
+    session_id = cl.user_session.get("id")
+    logger.info(f"Starting new chat session: {session_id}")
+
+    # Initialize conversation memory for this session
+    memory_manager = get_memory_manager()
+    session_memory = memory_manager.get_or_create_session(
+        session_id=session_id,
+        memory_type="buffer",  # Use buffer for now; could switch to summary for long conversations
+        max_token_limit=2000,
+    )
+    cl.user_session.set("memory", session_memory)
+
+    # Initialize query router for this session
+    cl.user_session.set("query_router", QueryRouter())
+
+    # Welcome message
+    await cl.Message(content=_WELCOME).send()
+
+    # Wire the session to the vector store preloaded at import
+    if vector_store_manager is not None:
+        cl.user_session.set("qa_chain", QAChain(vector_store_manager))
 
         # Initialize agent with loaded vector store
-        agent = EducationalDocumentAgent(vector_store_manager, verbose=False)
+        cl.user_session.set(
+            "agent", EducationalDocumentAgent(vector_store_manager, verbose=False)
+        )
 
         await cl.Message(
             content="✅ **Loaded existing document collection.** You can ask questions or upload new documents.\n\n"
@@ -98,9 +253,9 @@ Ready to begin? Upload your first document! 📄
             author="System",
         ).send()
 
-        logger.info("Loaded existing vector store, initialized agent, and activated conversation memory")
+        logger.info("Attached preloaded vector store, initialized agent, and activated conversation memory")
 
-    except FileNotFoundError:
+    else:
         logger.info("No existing vector store found - waiting for document upload")
         await cl.Message(
             content="💡 **No documents loaded yet.** Please upload a document to get started.",
@@ -111,10 +266,12 @@ Ready to begin? Upload your first document! 📄
 @cl.on_message
 async def main(message: cl.Message):
     """Handle incoming user messages."""
-    global qa_chain, vector_store_manager, query_router, agent
-
     logger.info(f"Received message: {message.content[:50]}...")
 
+    qa_chain = cl.user_session.get("qa_chain")
+    query_router = cl.user_session.get("query_router")
+    agent = cl.user_session.get("agent")
+
     # Check for file attachments
     if message.elements:
         await handle_file_upload(message.elements)
@@ -131,10 +288,18 @@ async def main(message: cl.Message):
         # Get session memory
         session_memory = cl.user_session.get("memory")
 
-        # Route the query
+        # Route the query (cached for repeated prompts)
         route = None
         if query_router:
-            route = query_router.route_query(message.content)
+            cache_key = message.content.strip().lower()[:256]
+            route = _ROUTE_CACHE.get(cache_key)
+            if route is None:
+                route = query_router.route_query(message.content)
+                _ROUTE_CACHE[cache_key] = route
+                if len(_ROUTE_CACHE) > _ROUTE_CACHE_MAX:
+                    _ROUTE_CACHE.popitem(last=False)
+            else:
+                _ROUTE_CACHE.move_to_end(cache_key)
             logger.info(
                 f"Query routed as {route.query_type.value} | "
                 f"Filter: {route.metadata_filter}"
@@ -161,12 +326,17 @@ async def main(message: cl.Message):
             msg = cl.Message(content="")
             await msg.send()
 
-            # Run agent (note: full streaming not yet implemented for agent)
-            result = await agent.ainvoke(message.content, query_type=route.query_type.value)
-
-            # Update message with agent output
-            agent_response = result['output']
-            await msg.stream_token(agent_response)
+            # Stream agent execution so output appears as steps complete
+            # instead of waiting for the whole ReAct loop to finish
+            agent_response = ""
+            async for event in agent.astream(message.content, query_type=route.query_type.value):
+                token = _extract_token(event)
+                if token:
+                    # Slice long step outputs so a long answer isn't sent
+                    # as one huge websocket frame
+                    for start in range(0, len(token), 128):
+                        await msg.stream_token(token[start:start + 128])
+                    agent_response = token
             await msg.update()
 
             # Save to memory
@@ -183,10 +353,10 @@ async def main(message: cl.Message):
             # Collect response for memory
             response_text = ""
 
-            # Stream the answer
-            async for token in qa_chain.astream(message.content):
-                await msg.stream_token(token)
-                response_text += token
+            # Stream the answer in coalesced batches to cut per-token overhead
+            async for chunk in _batched(qa_chain.astream(message.content)):
+                await msg.stream_token(chunk)
+                response_text += chunk
 
             # Finalize the message
             await msg.update()
@@ -206,7 +376,7 @@ async def main(message: cl.Message):
 
 async def handle_file_upload(files: list):
     """Handle file uploads."""
-    global vector_store_manager, qa_chain
+    global vector_store_manager
 
     logger.info(f"Received {len(files)} file(s) for upload")
 
@@ -222,77 +392,127 @@ async def handle_file_upload(files: list):
         upload_dir = Path("data/uploaded")
         upload_dir.mkdir(parents=True, exist_ok=True)
 
-        all_chunks = []
-
-        for file in files:
-            # Save file to upload directory
+        def _sync_process(file) -> list:
+            """Process a single file: save, load, enrich, and split (blocking)."""
             file_path = upload_dir / file.name
 
-            # Read file content based on Chainlit file object attributes
-            try:
-                # Try to get content from path (most common)
-                if hasattr(file, 'path') and file.path:
-                    with open(file.path, 'rb') as f:
-                        content = f.read()
-                # Fallback to content attribute
-                elif hasattr(file, 'content') and file.content is not None:
-                    content = file.content
-                else:
-                    logger.error(f"Cannot read file: {file.name} - no valid path or content")
-                    await cl.Message(
-                        content=f"⚠️ Cannot read file: {file.name}. Please try again.",
-                        author="System",
-                    ).send()
-                    continue
-
-                # Write to upload directory
-                with open(file_path, "wb") as f:
-                    f.write(content)
-
-            except Exception as e:
-                logger.error(f"Error reading file {file.name}: {e}")
-                await cl.Message(
-                    content=f"⚠️ Error reading file: {file.name}. Error: {str(e)}",
-                    author="System",
-                ).send()
-                continue
+            # Save to the upload directory based on Chainlit file object
+            # attributes. When a path is available (most common), copy
+            # file-to-file so the document is never buffered in memory.
+            # Reject oversized uploads before spending time on copy+parse
+            max_bytes = settings.max_file_size_mb * 1024 * 1024
+
+            path = getattr(file, 'path', None)
+            if path:
+                if os.path.getsize(path) > max_bytes:
+                    raise ValueError(
+                        f"File too large: {file.name} exceeds the "
+                        f"{settings.max_file_size_mb} MB upload limit"
+                    )
+                shutil.copyfile(path, file_path)
+            else:
+                # Fallback to content attribute (already in memory)
+                content = getattr(file, 'content', None)
+                if content is None:
+                    raise ValueError(
+                        f"Cannot read file: {file.name} - no valid path or content"
+                    )
+                if len(content) > max_bytes:
+                    raise ValueError(
+                        f"File too large: {file.name} exceeds the "
+                        f"{settings.max_file_size_mb} MB upload limit"
+                    )
+                file_path.write_bytes(content)
 
             logger.info(f"Processing file: {file.name}")
 
-            # Update progress
-            await processing_msg.update()
+            # Stream documents through metadata enrichment and chunking
+            # one at a time, so only the chunks (not the full raw document
+            # list as well) are held in memory
+            extractor = get_extractor()
+            extracted = None
+            chunks = []
+            for document in DocumentLoader.iter_documents(file_path):
+                if extracted is None:
+                    # Metadata from the first document (page) applies to all
+                    extracted = extractor.extract_metadata(document, filename=file.name)
+                    logger.info(f"Extracted metadata for {file.name}")
+                document.metadata.update(extracted)
+                document.metadata["source"] = file.name
+                chunks.extend(_SPLITTER.split_documents([document]))
 
-            # Load document
-            documents = DocumentLoader.load_document(file_path)
+            logger.info(f"Split {file.name} into {len(chunks)} chunks with metadata")
 
-            # Extract and enrich metadata
-            documents = extract_metadata_from_documents(documents, filename=file.name)
-            logger.info(f"Extracted metadata for {file.name}")
+            return chunks
 
-            # Split into chunks
-            splitter = DocumentSplitter()
-            chunks = splitter.split_documents(documents)
+        async def _process_one(file) -> list:
+            """Run the blocking per-file pipeline off the event loop."""
+            async with _UPLOAD_SEM:
+                return await asyncio.to_thread(_sync_process, file)
 
-            all_chunks.extend(chunks)
+        # Process all files concurrently - each file's work is independent,
+        # so disk I/O, PDF parsing, and chunking overlap across files
+        results = await asyncio.gather(
+            *[_process_one(file) for file in files],
+            return_exceptions=True,
+        )
 
-            logger.info(f"Split {file.name} into {len(chunks)} chunks with metadata")
+        all_chunks = []
+        for file, result in zip(files, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing file {file.name}: {result}")
+                await cl.Message(
+                    content=f"⚠️ Error processing file: {file.name}. Error: {str(result)}",
+                    author="System",
+                ).send()
+            else:
+                all_chunks.extend(result)
+
+        await processing_msg.update()
+
+        # Sort chunks by length so embedding batches are length-homogeneous,
+        # minimizing padding waste when the provider batches requests
+        all_chunks.sort(key=lambda chunk: len(chunk.page_content))
+
+        # Skip chunks whose content was already embedded in a previous
+        # upload (common when users re-upload the same file)
+        seen_hashes = _load_seen_hashes()
+        for chunk in all_chunks:
+            chunk.metadata["content_hash"] = hashlib.blake2b(
+                chunk.page_content.encode(), digest_size=16
+            ).hexdigest()
+        new_chunks = [
+            chunk for chunk in all_chunks
+            if chunk.metadata["content_hash"] not in seen_hashes
+        ]
+        if len(new_chunks) < len(all_chunks):
+            logger.info(
+                f"Skipping {len(all_chunks) - len(new_chunks)} already-embedded chunks"
+            )
 
         # Create or update vector store
         if vector_store_manager is None:
             vector_store_manager = VectorStoreManager()
 
         if vector_store_manager.vector_store is None:
-            # Create new vector store
+            # No store yet (or the cache outlived a deleted store) -
+            # create it from everything we have
             vector_store_manager.create_vector_store(all_chunks)
             logger.info("Created new vector store")
-        else:
-            # Add to existing vector store
-            vector_store_manager.add_documents(all_chunks)
+            seen_hashes.update(chunk.metadata["content_hash"] for chunk in all_chunks)
+            _save_seen_hashes(seen_hashes)
+        elif new_chunks:
+            # Add only the not-yet-embedded chunks to the existing store
+            vector_store_manager.add_documents(new_chunks)
             logger.info("Added documents to existing vector store")
+            seen_hashes.update(chunk.metadata["content_hash"] for chunk in new_chunks)
+            _save_seen_hashes(seen_hashes)
 
-        # Create/update QA chain and agent
-        qa_chain = QAChain(vector_store_manager)
-        agent = EducationalDocumentAgent(vector_store_manager, verbose=False)
+        # Create/update QA chain and agent for this session
+        cl.user_session.set("qa_chain", QAChain(vector_store_manager))
+        cl.user_session.set(
+            "agent", EducationalDocumentAgent(vector_store_manager, verbose=False)
+        )
 
         # Success message
         file_names = ", ".join([f.name for f in files])
@@ -300,7 +520,7 @@ async def handle_file_upload(files: list):
             content=f"""✅ **Successfully processed {len(files)} file(s)!**
 
 **Files:** {file_names}
-**Chunks created:** {len(all_chunks)}
+**Chunks created:** {len(all_chunks)} ({len(new_chunks)} newly embedded)
 
 You can now ask questions about your documents! Try asking:
 - "What is this document about?"
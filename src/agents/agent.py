@@ -4,13 +4,18 @@ This module implements a ReAct (Reasoning + Acting) agent using LangChain
 for handling complex multi-step queries.
 """
 
+import asyncio
+import re
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
+import httpx
 from langgraph.prebuilt import create_react_agent
+from langchain_core.messages import SystemMessage
 from langchain_openai import ChatOpenAI
 
 from src.agents.prompts import AGENT_SYSTEM_PROMPT, get_instruction_for_query_type
-from src.agents.tools import create_agent_tools
+from src.agents.tools import create_agent_tools, detect_schedule_conflicts
 from src.config.settings import settings
 from src.retrieval.vector_store import VectorStoreManager
 from src.utils.logging import get_logger
@@ -18,6 +23,61 @@ from src.utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+# One HTTP client pair shared by every ChatOpenAI instance so agent
+# construction never pays a fresh TLS handshake or connection-pool setup
+_HTTP_CLIENT = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+)
+_HTTP_ASYNC_CLIENT = httpx.AsyncClient(
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+)
+
+
+@lru_cache(maxsize=8)
+def _get_llm(model: str, temperature: float) -> ChatOpenAI:
+    """Get a shared ChatOpenAI instance for a (model, temperature) pair.
+
+    Constructing ChatOpenAI opens an HTTP connection pool; reusing one
+    instance across agent re-instantiations (which happen on every file
+    upload) avoids rebuilding the pool and leaking connections.
+
+    Args:
+        model: OpenAI model name
+        temperature: Sampling temperature
+
+    Returns:
+        ChatOpenAI: Shared LLM instance
+    """
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=settings.openai_api_key,
+        http_client=_HTTP_CLIENT,
+        http_async_client=_HTTP_ASYNC_CLIENT,
+    )
+
+
+# Compiled ReAct graphs keyed on (llm, vector store manager) so re-uploads
+# against the same store don't recompile the agent graph
+_AGENT_GRAPH_CACHE: Dict[tuple, Any] = {}
+
+@lru_cache(maxsize=8)
+def _instruction_message(query_type: str) -> SystemMessage:
+    """Pre-rendered system message for a query type.
+
+    The instruction text per query type is fixed, so the SystemMessage
+    is built once and reused - every invocation then sends a
+    byte-identical prefix, which keeps it eligible for the provider's
+    prompt-prefix cache instead of rebuilding the object per call.
+    """
+    return SystemMessage(content=get_instruction_for_query_type(query_type))
+
+
+# Teacher name in a "find scheduling conflicts for <Name>" style query,
+# matched by the direct-dispatch fast path
+_CONFLICT_NAME_RE = re.compile(
+    r"conflicts?\s+(?:for|where)\s+([A-Z][\w.'-]*(?:\s+[A-Z][\w.'-]*)+)"
+)
 
 
 # ============================================================================
@@ -50,27 +110,79 @@ class EducationalDocumentAgent:
         self.max_iterations = max_iterations
         self.verbose = verbose
 
-        # Initialize LLM
-        self.llm = ChatOpenAI(
-            model=self.model,
-            temperature=self.temperature,
-            api_key=settings.openai_api_key,
-        )
+        # Initialize LLM (shared across agent instances)
+        self.llm = _get_llm(self.model, self.temperature)
 
         # Create tools
         self.tools = create_agent_tools(vector_store_manager)
 
-        # Create ReAct agent using LangGraph
-        self.agent_executor = create_react_agent(
-            model=self.llm,
-            tools=self.tools,
-        )
+        # Create ReAct agent using LangGraph, reusing the compiled graph
+        # when the LLM and vector store haven't changed
+        cache_key = (id(self.llm), id(vector_store_manager))
+        if cache_key not in _AGENT_GRAPH_CACHE:
+            _AGENT_GRAPH_CACHE[cache_key] = create_react_agent(
+                model=self.llm,
+                tools=self.tools,
+            )
+        self.agent_executor = _AGENT_GRAPH_CACHE[cache_key]
 
         logger.info(
             f"Initialized EducationalDocumentAgent with {len(self.tools)} tools, "
             f"model: {self.model}"
         )
 
+    def _direct_dispatch(
+        self,
+        query: str,
+        query_type: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Answer a deterministic query with one retrieval plus tool call.
+
+        A "find scheduling conflicts for <name>" query needs no
+        multi-step reasoning: the conflict detector is deterministic
+        given retrieved schedule context, so routing it through the
+        ReAct loop only adds LLM round trips. This fast path extracts
+        the teacher name, retrieves context once, and runs the tool
+        directly. Anything it cannot answer confidently (no name, no
+        schedule entries in the retrieved context, retrieval failure)
+        falls through to the full agent loop.
+
+        Args:
+            query: User's question
+            query_type: Type of query for context
+
+        Returns:
+            Optional[Dict[str, Any]]: Agent-shaped result dict, or None
+                when the query needs the full ReAct loop
+        """
+        if query_type != "complex":
+            return None
+
+        match = _CONFLICT_NAME_RE.search(query)
+        if match is None:
+            return None
+
+        teacher_name = match.group(1)
+        try:
+            documents = self.vector_store_manager.similarity_search(
+                query, k=settings.top_k_results
+            )
+            context = "\n\n".join(doc.page_content for doc in documents)
+            report = detect_schedule_conflicts(teacher_name, context)
+        except Exception as e:
+            logger.warning(f"Direct tool dispatch failed, using agent loop: {e}")
+            return None
+
+        # The retrieved context may simply lack the schedule - let the
+        # agent search with its own strategies rather than answer "not found"
+        if report.startswith(("No schedule information", "Error")):
+            return None
+
+        logger.info(
+            f"Answered conflict query for {teacher_name} by direct tool dispatch"
+        )
+        return {"output": report, "intermediate_steps": []}
+
     def invoke(
         self,
         query: str,
@@ -93,25 +205,29 @@ class EducationalDocumentAgent:
         try:
             logger.info(f"Agent processing query (type: {query_type}): {query[:50]}...")
 
-            # Add instruction based on query type
-            instruction = get_instruction_for_query_type(query_type)
-            enhanced_query = f"{instruction}\n\nQuestion: {query}"
+            # Deterministic tool queries skip the ReAct loop entirely
+            direct = self._direct_dispatch(query, query_type)
+            if direct is not None:
+                return direct
+
+            # Add instruction based on query type as a stable system
+            # message - a constant prefix at a message boundary is
+            # eligible for provider-side prompt caching, unlike text
+            # concatenated into the user message
+            messages_in = [_instruction_message(query_type), ("user", query)]
 
             # Run the agent (LangGraph returns messages)
-            result = self.agent_executor.invoke({"messages": [("user", enhanced_query)]})
+            result = self.agent_executor.invoke({"messages": messages_in})
 
-            # Extract the final message
-            messages = result.get("messages", [])
-            if messages:
-                final_message = messages[-1]
-                output = final_message.content if hasattr(final_message, 'content') else str(final_message)
-            else:
-                output = "No response generated"
+            # Extract the final message - LangGraph always returns
+            # BaseMessage instances, so access .content directly
+            messages = result["messages"]
+            output = messages[-1].content if messages else "No response generated"
 
             logger.info("Agent completed successfully")
             return {
                 "output": output,
-                "intermediate_steps": messages[:-1] if len(messages) > 1 else []
+                "intermediate_steps": messages[:-1]
             }
 
         except Exception as e:
@@ -138,25 +254,27 @@ class EducationalDocumentAgent:
         try:
             logger.info(f"Agent processing query (async, type: {query_type}): {query[:50]}...")
 
-            # Add instruction based on query type
-            instruction = get_instruction_for_query_type(query_type)
-            enhanced_query = f"{instruction}\n\nQuestion: {query}"
+            # Deterministic tool queries skip the ReAct loop entirely;
+            # dispatch runs sync retrieval, so keep it off the event loop
+            direct = await asyncio.to_thread(self._direct_dispatch, query, query_type)
+            if direct is not None:
+                return direct
+
+            # Stable system-message instruction (see invoke)
+            messages_in = [_instruction_message(query_type), ("user", query)]
 
             # Run the agent (LangGraph returns messages)
-            result = await self.agent_executor.ainvoke({"messages": [("user", enhanced_query)]})
+            result = await self.agent_executor.ainvoke({"messages": messages_in})
 
-            # Extract the final message
-            messages = result.get("messages", [])
-            if messages:
-                final_message = messages[-1]
-                output = final_message.content if hasattr(final_message, 'content') else str(final_message)
-            else:
-                output = "No response generated"
+            # Extract the final message - LangGraph always returns
+            # BaseMessage instances, so access .content directly
+            messages = result["messages"]
+            output = messages[-1].content if messages else "No response generated"
 
             logger.info("Agent completed successfully")
             return {
                 "output": output,
-                "intermediate_steps": messages[:-1] if len(messages) > 1 else []
+                "intermediate_steps": messages[:-1]
             }
 
         except Exception as e:
@@ -183,12 +301,11 @@ class EducationalDocumentAgent:
         try:
             logger.info(f"Agent streaming query (type: {query_type}): {query[:50]}...")
 
-            # Add instruction based on query type
-            instruction = get_instruction_for_query_type(query_type)
-            enhanced_query = f"{instruction}\n\nQuestion: {query}"
+            # Stable system-message instruction (see invoke)
+            messages_in = [_instruction_message(query_type), ("user", query)]
 
             # Stream the agent execution
-            async for event in self.agent_executor.astream({"messages": [("user", enhanced_query)]}):
+            async for event in self.agent_executor.astream({"messages": messages_in}):
                 yield event
 
             logger.info("Agent streaming completed")
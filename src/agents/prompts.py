@@ -93,6 +93,16 @@ CSV_EXPORT_PROMPT = """To export data to CSV:
 4. Report the file location to the user"""
 
 
+# Lookup table built once at import - get_instruction_for_query_type is
+# called on every agent invocation
+_INSTRUCTIONS = {
+    "simple": SIMPLE_QUERY_INSTRUCTION,
+    "cross_document": CROSS_DOCUMENT_INSTRUCTION,
+    "aggregation": AGGREGATION_INSTRUCTION,
+    "complex": COMPLEX_INSTRUCTION,
+}
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
@@ -106,16 +116,7 @@ def get_instruction_for_query_type(query_type: str) -> str:
     Returns:
         str: Specific instruction for the query type
     """
-    instructions = {
-        "simple": SIMPLE_QUERY_INSTRUCTION,
-        "cross_document": CROSS_DOCUMENT_INSTRUCTION,
-        "aggregation": AGGREGATION_INSTRUCTION,
-        "complex": COMPLEX_INSTRUCTION,
-    }
-
-    instruction = instructions.get(query_type.lower(), SIMPLE_QUERY_INSTRUCTION)
-    logger.debug(f"Using instruction for query type: {query_type}")
-    return instruction
+    return _INSTRUCTIONS.get(query_type.lower(), SIMPLE_QUERY_INSTRUCTION)
 
 
 def build_agent_prompt(query: str, query_type: str = "simple") -> str:
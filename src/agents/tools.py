@@ -4,10 +4,16 @@ This module provides specialized tools for the ReAct agent to perform
 complex reasoning tasks on educational documents.
 """
 
+import ast
 import csv
+import mmap
+import operator
 import re
+from collections import defaultdict
+from functools import lru_cache
 from datetime import datetime
-from io import StringIO
+from io import StringIO, TextIOWrapper
+from itertools import chain
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -20,6 +26,21 @@ from src.utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+# Schedule-parsing patterns, compiled once at import - detect_schedule_conflicts
+# runs them on every line of the supplied context
+# Format: Day, Time, Class, Teacher, Room
+_TIME_RE = re.compile(r'(\w+)\s+(\d{1,2}:\d{2}\s+[AP]M)\s*[-:]\s*(\d{1,2}:\d{2}\s+[AP]M)')
+_CLASS_RE = re.compile(r'(O-?Level|A-?Level|Level-?[IVX]+)\s+Section\s+([A-Z])', re.IGNORECASE)
+_CLASS_FALLBACK_RE = re.compile(r'\b([OA]\d[A-Z])\b')
+
+# Bytes twin of the time pattern, for scanning mmap'd schedule files
+# without decoding the whole file first
+_TIME_RE_B = re.compile(_TIME_RE.pattern.encode('ascii'))
+
+# Export filename sanitizer, compiled once instead of per export call
+_FILENAME_SANITIZE_RE = re.compile(r'[^a-zA-Z0-9_-]')
+
+
 # ============================================================================
 # Tool 1: Calculator
 # ============================================================================
@@ -29,32 +50,66 @@ class CalculatorInput(BaseModel):
     expression: str = Field(description="Mathematical expression to evaluate (e.g., '15 + 7', '100 / 4')")
 
 
-def calculator(expression: str) -> str:
-    """Safely evaluate mathematical expressions.
+# Characters allowed in a calculator expression, validated in one
+# C-level scan instead of a per-character Python loop
+_SAFE_EXPR_RE = re.compile(r'[0-9+\-*/(). ,]+')
+
+# Operators the calculator is allowed to evaluate
+_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+def _eval_node(node):
+    """Recursively evaluate an arithmetic AST node.
+
+    Only numeric constants, the binary/unary operators in _OPS, and
+    parenthesized combinations thereof are accepted; anything else
+    raises SyntaxError. This keeps evaluation strictly arithmetic
+    without going through eval().
 
     Args:
-        expression: Mathematical expression to evaluate
+        node: AST node to evaluate
 
     Returns:
-        str: Result of the calculation or error message
+        int | float: Evaluated value
 
-    Example:
-        >>> calculator("15 + 7")
-        "22"
-        >>> calculator("100 / 4")
-        "25.0"
+    Raises:
+        SyntaxError: If the node is not a supported arithmetic construct
     """
-    try:
-        # Clean the expression
-        expression = expression.strip()
+    if isinstance(node, ast.Expression):
+        return _eval_node(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval_node(node.left), _eval_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval_node(node.operand))
+    raise SyntaxError("Unsupported expression element")
+
+
+@lru_cache(maxsize=1024)
+def _calculator_impl(expression: str) -> str:
+    """Validate and evaluate a whitespace-normalized expression.
+
+    Args:
+        expression: Normalized mathematical expression
 
+    Returns:
+        str: Result of the calculation or error message
+    """
+    try:
         # Only allow safe mathematical operations
-        allowed_chars = set('0123456789+-*/()., ')
-        if not all(c in allowed_chars for c in expression):
+        if not _SAFE_EXPR_RE.fullmatch(expression):
             return f"Error: Invalid characters in expression. Only numbers and operators (+, -, *, /) are allowed."
 
-        # Evaluate the expression
-        result = eval(expression, {"__builtins__": {}}, {})
+        # Evaluate via a restricted AST walk instead of eval()
+        result = _eval_node(ast.parse(expression, mode='eval'))
 
         logger.info(f"Calculator: {expression} = {result}")
         return str(result)
@@ -68,6 +123,28 @@ def calculator(expression: str) -> str:
         return f"Error: Could not evaluate expression: {str(e)}"
 
 
+def calculator(expression: str) -> str:
+    """Safely evaluate mathematical expressions.
+
+    Results are memoized, so repeated expressions (common in agent
+    counting workflows) are answered from cache.
+
+    Args:
+        expression: Mathematical expression to evaluate
+
+    Returns:
+        str: Result of the calculation or error message
+
+    Example:
+        >>> calculator("15 + 7")
+        "22"
+        >>> calculator("100 / 4")
+        "25.0"
+    """
+    # Normalize whitespace so "1+2" and "1 + 2" share a cache entry
+    return _calculator_impl(" ".join(expression.split()))
+
+
 # ============================================================================
 # Tool 2: Schedule Conflict Detector
 # ============================================================================
@@ -78,6 +155,92 @@ class ConflictDetectorInput(BaseModel):
     context: str = Field(description="Relevant schedule information from documents")
 
 
+def _to_minutes(time_str: str) -> int:
+    """Convert a 12-hour clock time like "9:00 AM" to minutes since midnight.
+
+    Args:
+        time_str: Time in "H:MM AM/PM" format (as captured by _TIME_RE)
+
+    Returns:
+        int: Minutes since midnight
+    """
+    clock, meridiem = time_str.rsplit(None, 1)
+    hours, minutes = clock.split(':')
+    hours = int(hours) % 12
+    if meridiem[0] in 'Pp':
+        hours += 12
+    return hours * 60 + int(minutes)
+
+
+def _summarize_conflicts(teacher_name: str, teacher_schedule: List[Dict]) -> str:
+    """Find overlapping schedule entries per day and describe them.
+
+    Entries carry start/end minutes, so this is a sort-and-sweep over
+    intervals: within each day, sort by start time and compare each
+    entry against the latest end seen so far. That catches partial
+    overlaps (9:00-10:30 vs 10:00-11:00), not just identical slots, in
+    O(n log n) with no quadratic pair scan.
+
+    Args:
+        teacher_name: Name of the teacher being checked
+        teacher_schedule: Parsed entries with 'day', 'time', 'class',
+            'start' and 'end' keys (start/end in minutes since midnight)
+
+    Returns:
+        str: Conflict report or "No scheduling conflicts found" message
+    """
+    # Overlapping retrieval chunks repeat the same schedule line, and a
+    # duplicated entry would read as a class conflicting with itself -
+    # keep one entry per (day, start, end, class)
+    seen = set()
+    unique = []
+    for entry in teacher_schedule:
+        key = (entry['day'], entry['start'], entry['end'], entry['class'])
+        if key not in seen:
+            seen.add(key)
+            unique.append(entry)
+    teacher_schedule = unique
+
+    # A single entry can never conflict - skip the sweep entirely
+    if len(teacher_schedule) < 2:
+        return f"No scheduling conflicts found for {teacher_name}"
+
+    by_day = defaultdict(list)
+    for entry in teacher_schedule:
+        by_day[entry['day']].append(entry)
+
+    conflicts = []
+    for day, entries in by_day.items():
+        entries.sort(key=lambda e: (e['start'], e['end']))
+        # Sweep against the entry with the latest end so far, so an
+        # early long class conflicts with every class it spans
+        latest = entries[0]
+        for entry in entries[1:]:
+            if entry['start'] < latest['end']:
+                if entry['time'] == latest['time']:
+                    conflicts.append(
+                        f"{day} {entry['time']}: Teaching both "
+                        f"{latest['class']} and {entry['class']}"
+                    )
+                else:
+                    conflicts.append(
+                        f"{day}: {latest['class']} ({latest['time']}) overlaps "
+                        f"{entry['class']} ({entry['time']})"
+                    )
+            if entry['end'] > latest['end']:
+                latest = entry
+
+    if conflicts:
+        result = f"Found {len(conflicts)} scheduling conflict(s) for {teacher_name}:\n"
+        for i, conflict in enumerate(conflicts, 1):
+            result += f"{i}. {conflict}\n"
+        logger.info(f"Conflicts detected: {len(conflicts)}")
+        return result.strip()
+    else:
+        logger.info("No conflicts found")
+        return f"No scheduling conflicts found for {teacher_name}"
+
+
 def detect_schedule_conflicts(teacher_name: str, context: str) -> str:
     """Detect scheduling conflicts for a teacher.
 
@@ -93,38 +256,108 @@ def detect_schedule_conflicts(teacher_name: str, context: str) -> str:
 
     Example:
         >>> detect_schedule_conflicts("Muhammad Hammad", schedule_text)
-        "Found 2 conflicts:\n1. Monday 9:00 AM: Teaching both O1A and O1B\n..."
+        "Found 2 conflicts:\n1. Monday 9:00 AM - 10:00 AM: Teaching both O1A and O1B\n..."
     """
     try:
         logger.info(f"Checking conflicts for teacher: {teacher_name}")
 
-        # Parse schedule entries
-        # Format: Day, Time, Class, Teacher, Room
-        time_pattern = r'(\w+)\s+(\d{1,2}:\d{2}\s+[AP]M)\s*[-:]\s*\d{1,2}:\d{2}\s+[AP]M'
+        # Match the teacher name case-insensitively without allocating a
+        # lowercase copy of every line
+        name_re = re.compile(re.escape(teacher_name), re.IGNORECASE)
 
-        # Find all mentions of the teacher with time information
-        lines = context.split('\n')
+        # Sweep the whole context once with the compiled time pattern
+        # (one C-level scan) instead of splitting into lines and running
+        # the regex on each; the containing line is recovered per hit
         teacher_schedule = []
+        for time_match in _TIME_RE.finditer(context):
+            line_start = context.rfind('\n', 0, time_match.start()) + 1
+            line_end = context.find('\n', time_match.end())
+            if line_end == -1:
+                line_end = len(context)
+            line = context[line_start:line_end]
+
+            # Only keep entries on lines mentioning the teacher
+            if not name_re.search(line):
+                continue
+
+            day = time_match.group(1)
+            start, end = time_match.group(2), time_match.group(3)
+
+            # Extract class/section info
+            class_match = _CLASS_RE.search(line) or _CLASS_FALLBACK_RE.search(line)
+            class_name = class_match.group(0) if class_match else "Unknown Class"
+
+            teacher_schedule.append({
+                'day': day,
+                'time': f"{start} - {end}",
+                'start': _to_minutes(start),
+                'end': _to_minutes(end),
+                'class': class_name,
+                'line': line.strip()
+            })
+
+        if not teacher_schedule:
+            return f"No schedule information found for {teacher_name}"
 
-        for line in lines:
-            # Check if line mentions the teacher
-            if teacher_name.lower() in line.lower():
-                # Try to extract time information
-                time_match = re.search(time_pattern, line)
-                if time_match:
-                    day = time_match.group(1)
-                    time = time_match.group(2)
+        return _summarize_conflicts(teacher_name, teacher_schedule)
 
-                    # Extract class/section info
-                    class_match = re.search(r'(O-?Level|A-?Level|Level-?[IVX]+)\s+Section\s+([A-Z])', line, re.IGNORECASE)
-                    if not class_match:
-                        class_match = re.search(r'\b([OA]\d[A-Z])\b', line)
+    except Exception as e:
+        logger.error(f"Error detecting conflicts: {e}")
+        return f"Error analyzing schedule: {str(e)}"
+
+
+def detect_schedule_conflicts_from_path(teacher_name: str, file_path: str | Path) -> str:
+    """Detect scheduling conflicts by scanning a schedule file directly.
+
+    Memory-maps the file and sweeps it with a bytes version of the time
+    pattern, so large exported schedules are scanned without reading the
+    whole file into a Python string; only matching lines are decoded.
+
+    Args:
+        teacher_name: Name of the teacher to check
+        file_path: Path to a text file containing schedule data
+
+    Returns:
+        str: Description of conflicts found or "No conflicts found"
+
+    Example:
+        >>> detect_schedule_conflicts_from_path("Muhammad Hammad", "data/exports/schedule.txt")
+        "No scheduling conflicts found for Muhammad Hammad"
+    """
+    try:
+        file_path = Path(file_path)
+        logger.info(f"Checking conflicts for {teacher_name} in file: {file_path}")
+
+        name_re_b = re.compile(re.escape(teacher_name).encode('utf-8'), re.IGNORECASE)
+
+        teacher_schedule = []
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for time_match in _TIME_RE_B.finditer(mm):
+                    line_start = mm.rfind(b'\n', 0, time_match.start()) + 1
+                    line_end = mm.find(b'\n', time_match.end())
+                    if line_end == -1:
+                        line_end = len(mm)
+                    raw_line = mm[line_start:line_end]
+
+                    # Only keep entries on lines mentioning the teacher
+                    if not name_re_b.search(raw_line):
+                        continue
+
+                    line = raw_line.decode('utf-8', errors='replace')
+                    day = time_match.group(1).decode('utf-8', errors='replace')
+                    start = time_match.group(2).decode('utf-8', errors='replace')
+                    end = time_match.group(3).decode('utf-8', errors='replace')
 
+                    # Extract class/section info
+                    class_match = _CLASS_RE.search(line) or _CLASS_FALLBACK_RE.search(line)
                     class_name = class_match.group(0) if class_match else "Unknown Class"
 
                     teacher_schedule.append({
                         'day': day,
-                        'time': time,
+                        'time': f"{start} - {end}",
+                        'start': _to_minutes(start),
+                        'end': _to_minutes(end),
                         'class': class_name,
                         'line': line.strip()
                     })
@@ -132,30 +365,10 @@ def detect_schedule_conflicts(teacher_name: str, context: str) -> str:
         if not teacher_schedule:
             return f"No schedule information found for {teacher_name}"
 
-        # Check for conflicts (same day and time)
-        conflicts = []
-        for i, entry1 in enumerate(teacher_schedule):
-            for entry2 in teacher_schedule[i+1:]:
-                if entry1['day'] == entry2['day'] and entry1['time'] == entry2['time']:
-                    conflict_desc = (
-                        f"{entry1['day']} {entry1['time']}: "
-                        f"Teaching both {entry1['class']} and {entry2['class']}"
-                    )
-                    if conflict_desc not in conflicts:
-                        conflicts.append(conflict_desc)
-
-        if conflicts:
-            result = f"Found {len(conflicts)} scheduling conflict(s) for {teacher_name}:\n"
-            for i, conflict in enumerate(conflicts, 1):
-                result += f"{i}. {conflict}\n"
-            logger.info(f"Conflicts detected: {len(conflicts)}")
-            return result.strip()
-        else:
-            logger.info("No conflicts found")
-            return f"No scheduling conflicts found for {teacher_name}"
+        return _summarize_conflicts(teacher_name, teacher_schedule)
 
     except Exception as e:
-        logger.error(f"Error detecting conflicts: {e}")
+        logger.error(f"Error detecting conflicts from file: {e}")
         return f"Error analyzing schedule: {str(e)}"
 
 
@@ -169,6 +382,24 @@ class CSVExporterInput(BaseModel):
     filename: str = Field(description="Output filename (without .csv extension)")
 
 
+def _to_row(line: str) -> tuple:
+    """Convert one plain-text line into an (item, value) CSV row.
+
+    Args:
+        line: Stripped non-empty input line
+
+    Returns:
+        tuple: Two-element row split on the first ':' or '-' delimiter,
+            or (line, '') when no delimiter is present
+    """
+    key, sep, value = line.partition(':')
+    if not sep:
+        key, sep, value = line.partition('-')
+    if sep:
+        return (key.strip(), value.strip())
+    return (line, '')
+
+
 def export_to_csv(data: str, filename: str = "export") -> str:
     """Export structured data to CSV format.
 
@@ -191,36 +422,37 @@ def export_to_csv(data: str, filename: str = "export") -> str:
         export_dir.mkdir(parents=True, exist_ok=True)
 
         # Clean filename
-        filename = re.sub(r'[^a-zA-Z0-9_-]', '_', filename)
+        filename = _FILENAME_SANITIZE_RE.sub('_', filename)
         filepath = export_dir / f"{filename}.csv"
 
         # Try to parse the data
-        # Assume data is either already CSV-like or needs to be structured
-        lines = [line.strip() for line in data.split('\n') if line.strip()]
+        # Assume data is either already CSV-like or needs to be structured;
+        # strip each line once via map instead of stripping twice per line
+        lines = [line for line in map(str.strip, data.split('\n')) if line]
 
         if not lines:
             return "Error: No data to export"
 
-        # Check if data looks like CSV (has commas)
+        # Rows stay lazy: csv.reader consumes the line list directly (no
+        # '\n'.join round-trip) and the plain-list path is a generator,
+        # so writerows streams straight to the buffered file without an
+        # intermediate row list or joined string
         if ',' in lines[0]:
-            # Data is already CSV-formatted
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                f.write(data)
+            # Data is already CSV-formatted - round-trip through csv.reader
+            # so quoting is normalized instead of writing the raw string.
+            # The reader gets the raw data, not the stripped lines: a
+            # quoted field may legitimately contain a newline, which
+            # line-splitting would tear into malformed rows
+            rows = (row for row in csv.reader(StringIO(data)) if row)
         else:
             # Try to structure as simple list
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Item', 'Value'])
-                for line in lines:
-                    # Try to split on common delimiters
-                    if ':' in line:
-                        parts = line.split(':', 1)
-                        writer.writerow([parts[0].strip(), parts[1].strip()])
-                    elif '-' in line:
-                        parts = line.split('-', 1)
-                        writer.writerow([parts[0].strip(), parts[1].strip()])
-                    else:
-                        writer.writerow([line, ''])
+            rows = chain([('Item', 'Value')], map(_to_row, lines))
+
+        # Buffered binary file under a text wrapper: writes batch into
+        # 64 KB syscalls and memory stays constant regardless of rows
+        with open(filepath, 'wb', buffering=65536) as raw:
+            with TextIOWrapper(raw, encoding='utf-8', newline='') as f:
+                csv.writer(f, lineterminator='\n').writerows(rows)
 
         logger.info(f"CSV exported to: {filepath}")
         return f"CSV exported successfully to: {filepath}"
@@ -277,11 +509,11 @@ def create_document_search_tool(vector_store_manager: VectorStoreManager):
             if not results:
                 return "No relevant information found in documents."
 
-            # Combine results
-            combined = "\n\n".join([
+            # Combine results (generator - no intermediate list)
+            combined = "\n\n".join(
                 f"[From {doc.metadata.get('source', 'unknown')}]\n{doc.page_content}"
                 for doc in results
-            ])
+            )
 
             logger.info(f"Found {len(results)} relevant documents")
             return combined
@@ -312,58 +544,72 @@ def create_document_search_tool(vector_store_manager: VectorStoreManager):
 # Tool Factory: Create all tools
 # ============================================================================
 
-def create_agent_tools(vector_store_manager: VectorStoreManager):
-    """Create all tools for the agent.
+# Vector-store-independent tools are decorated once at module scope -
+# LangChain's @tool runs pydantic schema inference at decoration time,
+# so rebuilding them per agent was pure overhead
+
+@tool
+def calculator_tool(expression: str) -> str:
+    """Perform mathematical calculations.
+
+    Useful for arithmetic operations like addition, subtraction, multiplication, division.
 
     Args:
-        vector_store_manager: VectorStoreManager with loaded documents
+        expression: Mathematical expression (e.g., '15 + 7' or '100 / 4')
 
     Returns:
-        List of tools for the agent to use
+        Result of calculation
     """
-    @tool
-    def calculator_tool(expression: str) -> str:
-        """Perform mathematical calculations.
+    return calculator(expression)
 
-        Useful for arithmetic operations like addition, subtraction, multiplication, division.
 
-        Args:
-            expression: Mathematical expression (e.g., '15 + 7' or '100 / 4')
+@tool
+def detect_conflicts_tool(teacher_name: str, context: str) -> str:
+    """Detect scheduling conflicts for a teacher.
 
-        Returns:
-            Result of calculation
-        """
-        return calculator(expression)
+    Finds times when a teacher is assigned to multiple classes simultaneously.
 
-    @tool
-    def detect_conflicts_tool(teacher_name: str, context: str) -> str:
-        """Detect scheduling conflicts for a teacher.
+    Args:
+        teacher_name: Name of the teacher
+        context: Schedule information containing class times and assignments
 
-        Finds times when a teacher is assigned to multiple classes simultaneously.
+    Returns:
+        Description of conflicts found or "No conflicts found"
+    """
+    return detect_schedule_conflicts(teacher_name, context)
 
-        Args:
-            teacher_name: Name of the teacher
-            context: Schedule information containing class times and assignments
 
-        Returns:
-            Description of conflicts found or "No conflicts found"
-        """
-        return detect_schedule_conflicts(teacher_name, context)
+@tool
+def export_csv_tool(data: str, filename: str = "export") -> str:
+    """Export structured data to CSV format.
 
-    @tool
-    def export_csv_tool(data: str, filename: str = "export") -> str:
-        """Export structured data to CSV format.
+    Creates a CSV file from structured data.
 
-        Creates a CSV file from structured data.
+    Args:
+        data: Text data to export
+        filename: Output filename (without .csv extension)
 
-        Args:
-            data: Text data to export
-            filename: Output filename (without .csv extension)
+    Returns:
+        Path to created CSV file
+    """
+    return export_to_csv(data, filename)
 
-        Returns:
-            Path to created CSV file
-        """
-        return export_to_csv(data, filename)
+
+def create_agent_tools(vector_store_manager: VectorStoreManager):
+    """Create all tools for the agent.
+
+    The tool list is cached on the manager, so repeated agent
+    construction against the same vector store reuses it.
+
+    Args:
+        vector_store_manager: VectorStoreManager with loaded documents
+
+    Returns:
+        List of tools for the agent to use
+    """
+    cached = getattr(vector_store_manager, "_agent_tools", None)
+    if cached is not None:
+        return cached
 
     tools = [
         calculator_tool,
@@ -371,6 +617,7 @@ def create_agent_tools(vector_store_manager: VectorStoreManager):
         export_csv_tool,
         create_document_search_tool(vector_store_manager),
     ]
+    vector_store_manager._agent_tools = tools
 
     logger.info(f"Created {len(tools)} tools for agent")
     return tools
@@ -3,6 +3,8 @@
 This module provides a RAG chain for question answering over documents.
 """
 
+import asyncio
+from functools import lru_cache
 from typing import Dict, Any
 
 from langchain_core.output_parsers import StrOutputParser
@@ -34,6 +36,25 @@ Instructions:
 Answer:"""
 
 
+def _format_docs(docs) -> str:
+    """Join retrieved documents into a single context string."""
+    return "\n\n".join(doc.page_content for doc in docs)
+
+
+@lru_cache(maxsize=16)
+def _make_prompt(template: str) -> ChatPromptTemplate:
+    """Build (and cache) a ChatPromptTemplate for a template string.
+
+    from_template parses the template on every call; chains sharing a
+    template string (the default, in practice) reuse one parsed prompt.
+    """
+    return ChatPromptTemplate.from_template(template)
+
+
+# StrOutputParser is stateless - one instance serves every chain
+_STR_PARSER = StrOutputParser()
+
+
 class QAChain:
     """Question-answering chain using RAG with LCEL."""
 
@@ -57,47 +78,82 @@ class QAChain:
         self.temperature = temperature if temperature is not None else settings.temperature
         self.prompt_template = prompt_template or DEFAULT_QA_TEMPLATE
 
-        # Initialize LLM
-        self.llm = ChatOpenAI(
+        # Separate streaming and non-streaming LLM instances: the invoke
+        # paths receive one response blob (fewer HTTP chunks to parse)
+        # while the stream paths keep token-by-token delivery
+        self._llm_batch = ChatOpenAI(
+            model=self.model,
+            temperature=self.temperature,
+            openai_api_key=settings.openai_api_key,
+            streaming=False,
+        )
+        self._llm_stream = ChatOpenAI(
             model=self.model,
             temperature=self.temperature,
             openai_api_key=settings.openai_api_key,
             streaming=True,
         )
+        self.llm = self._llm_stream
 
-        # Create prompt
-        self.prompt = ChatPromptTemplate.from_template(self.prompt_template)
+        # Create prompt (parsed once per distinct template string)
+        self.prompt = _make_prompt(self.prompt_template)
 
         # Get retriever
         self.retriever = self.vector_store_manager.as_retriever()
 
-        # Build LCEL chain
-        self.chain = self._build_chain()
+        # Memoize retrieval per normalized question so repeated identical
+        # queries skip the vector-store similarity search entirely
+        self._retrieve = lru_cache(maxsize=256)(self._retrieve_uncached)
+
+        # Build LCEL chains - one per LLM mode
+        self.chain = self._build_chain(self._llm_batch)
+        self._stream_chain = self._build_chain(self._llm_stream)
+
+        # Generation-only chains fed pre-retrieved context instead of
+        # retrieving inside the chain: streaming for astream, batch for
+        # invoke_with_sources
+        self._generation_chain = self.prompt | self._llm_stream | _STR_PARSER
+        self._generation_chain_batch = self.prompt | self._llm_batch | _STR_PARSER
 
         logger.info(
             f"Initialized QAChain with model: {self.model}, "
             f"temperature: {self.temperature}"
         )
 
-    def _build_chain(self):
+    def _retrieve_uncached(self, question: str):
+        """Fetch source documents from the retriever (tuple so it's cacheable)."""
+        return tuple(self.retriever.invoke(question))
+
+    def clear_retrieval_cache(self) -> None:
+        """Clear memoized retrieval results.
+
+        Call this after the underlying vector store is reindexed so stale
+        document sets aren't served for previously seen questions.
+        """
+        self._retrieve.cache_clear()
+
+    def _build_chain(self, llm):
         """Build the LCEL chain for Q&A.
 
+        Args:
+            llm: ChatOpenAI instance to generate with
+
         Returns:
             Runnable: LCEL chain
         """
-        # Helper function to format documents
-        def format_docs(docs):
-            return "\n\n".join(doc.page_content for doc in docs)
+        # Retrieval goes through the per-question cache before formatting
+        def retrieve_context(question: str) -> str:
+            return _format_docs(self._retrieve(question.strip()))
 
         # Build chain using LCEL pipe operator
         chain = (
             {
-                "context": self.retriever | format_docs,
+                "context": retrieve_context,
                 "question": RunnablePassthrough(),
             }
             | self.prompt
-            | self.llm
-            | StrOutputParser()
+            | llm
+            | _STR_PARSER
         )
 
         return chain
@@ -125,6 +181,36 @@ class QAChain:
             logger.error(f"Error processing question: {e}")
             raise
 
+    def invoke_with_sources(self, question: str):
+        """Answer a question and return the source documents it used.
+
+        Runs retrieval exactly once and feeds the same documents to both
+        the answer and the returned sources, instead of the caller pairing
+        invoke with get_source_documents and retrieving twice.
+
+        Args:
+            question: User's question
+
+        Returns:
+            tuple[str, list]: Generated answer and the source documents
+
+        Example:
+            >>> chain = QAChain(vector_store_manager)
+            >>> answer, sources = chain.invoke_with_sources("What is the schedule?")
+            >>> print(answer, len(sources))
+        """
+        try:
+            logger.info(f"Processing question with sources: {question[:50]}...")
+            docs = self._retrieve(question.strip())
+            answer = self._generation_chain_batch.invoke(
+                {"context": _format_docs(docs), "question": question}
+            )
+            logger.info(f"Successfully generated answer with {len(docs)} sources")
+            return answer, list(docs)
+        except Exception as e:
+            logger.error(f"Error processing question: {e}")
+            raise
+
     async def ainvoke(self, question: str) -> str:
         """Async version of invoke.
 
@@ -163,7 +249,7 @@ class QAChain:
         """
         try:
             logger.info(f"Streaming answer for: {question[:50]}...")
-            for token in self.chain.stream(question):
+            for token in self._stream_chain.stream(question):
                 yield token
         except Exception as e:
             logger.error(f"Error streaming answer: {e}")
@@ -185,7 +271,13 @@ class QAChain:
         """
         try:
             logger.info(f"Streaming answer (async) for: {question[:50]}...")
-            async for token in self.chain.astream(question):
+
+            # Run retrieval in a worker thread so the event loop stays
+            # free, then stream generation over the prepared context
+            docs = await asyncio.to_thread(self._retrieve, question.strip())
+            inputs = {"context": _format_docs(docs), "question": question}
+
+            async for token in self._generation_chain.astream(inputs):
                 yield token
         except Exception as e:
             logger.error(f"Error streaming answer: {e}")
@@ -208,7 +300,7 @@ class QAChain:
         """
         try:
             logger.info(f"Retrieving source documents for: {question[:50]}...")
-            sources = self.retriever.invoke(question)
+            sources = list(self._retrieve(question.strip()))
             logger.info(f"Retrieved {len(sources)} source documents")
             return sources
         except Exception as e:
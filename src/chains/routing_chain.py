@@ -4,10 +4,14 @@ This module provides intelligent query routing to determine the best
 retrieval strategy based on query complexity and requirements.
 """
 
+import math
+import re
+import string
+from collections import OrderedDict, deque
 from enum import Enum
+from functools import lru_cache
 from typing import Dict, Optional
 
-from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
@@ -68,17 +72,44 @@ Metadata Extraction:
 - If the query mentions specific sections (A, B, C), suggest a filter
 
 User Query: {query}
+"""
 
-Analyze this query and respond with:
-1. Query type (simple, cross_document, aggregation, or complex)
-2. Brief reasoning (1-2 sentences)
-3. Suggested metadata filter (if applicable, as JSON: {{"key": "value"}})
 
-Response format:
-Type: [query_type]
-Reasoning: [your reasoning]
-Filter: [metadata filter or "none"]
-"""
+# Bounds for the per-router decision caches
+_ROUTE_CACHE_MAX = 1024
+_SEMANTIC_CACHE_MAX = 64
+
+
+@lru_cache(maxsize=8)
+def _get_llm(model: str, temperature: float) -> ChatOpenAI:
+    """Get a shared ChatOpenAI instance for a (model, temperature) pair.
+
+    ChatOpenAI construction runs pydantic validation and sets up an httpx
+    connection pool; routers with the same parameters share one instance
+    so the pool (and its warm TCP/TLS connections) is reused.
+    """
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=settings.openai_api_key,
+    )
+
+# All heuristic keyword groups fused into one alternation so classification
+# is a single regex scan over the query instead of three any(...) passes;
+# priority between matched groups is applied after the scan.
+_HEURISTIC_RE = re.compile(
+    r"(?P<aggregation>how many|count|total|number of)"
+    r"|(?P<complex>conflict|generate|export|csv)"
+    r"|(?P<cross_document>\ball\b|which students|list|show me)",
+    re.IGNORECASE,
+)
+
+# Heuristic confidence needed to skip the routing LLM entirely
+_HEURISTIC_CONFIDENCE = 0.8
+
+# ASCII-only lowercase table: str.translate skips Unicode case-folding and
+# avoids allocating a copy when the query is already lowercase
+_LOWER_TABLE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
 
 
 class QueryRouter:
@@ -98,25 +129,144 @@ class QueryRouter:
         self.model = model or settings.llm_model
         self.temperature = temperature
 
-        # Initialize LLM for routing
-        self.llm = ChatOpenAI(
-            model=self.model,
-            temperature=self.temperature,
-            api_key=settings.openai_api_key,
-        )
+        # Initialize LLM for routing (shared across router instances)
+        self.llm = _get_llm(self.model, self.temperature)
 
         # Create routing prompt
         self.routing_prompt = ChatPromptTemplate.from_template(ROUTING_TEMPLATE)
 
-        # Build routing chain using LCEL
+        # Build routing chain using LCEL; structured output makes the LLM
+        # return a validated QueryRoute directly, so no freeform response
+        # parsing (and none of its format-drift failure modes) is needed
         self.routing_chain = (
             self.routing_prompt
-            | self.llm
-            | StrOutputParser()
+            | self.llm.with_structured_output(QueryRoute)
         )
 
+        # Decision caches: exact-match LRU on the normalized query, plus a
+        # small semantic layer of (unit embedding, route) pairs so near-
+        # identical rephrasings also skip the routing LLM round trip
+        self._route_cache: OrderedDict[str, QueryRoute] = OrderedDict()
+        self._semantic_cache: deque = deque(maxlen=_SEMANTIC_CACHE_MAX)
+        self._embeddings = None  # created lazily on first semantic lookup
+
         logger.info(f"Initialized QueryRouter with model: {self.model}")
 
+    def _embed_query(self, query: str) -> Optional[tuple]:
+        """Embed a query as a unit vector for the semantic cache.
+
+        Returns None (and disables nothing) if embedding fails - routing
+        must never break because the cache could not be consulted.
+        """
+        try:
+            if self._embeddings is None:
+                from src.retrieval.embeddings import get_embeddings
+                self._embeddings = get_embeddings()
+            vector = self._embeddings.embed_query(query)
+            norm = math.sqrt(sum(v * v for v in vector))
+            if norm == 0:
+                return None
+            return tuple(v / norm for v in vector)
+        except Exception as e:
+            logger.warning(f"Routing cache embedding failed: {e}")
+            return None
+
+    def _cached_route(self, normalized_query: str) -> Optional[QueryRoute]:
+        """Look up a cached routing decision for a normalized query.
+
+        Checks the exact-match LRU first, then falls back to cosine
+        similarity against recently cached decisions.
+
+        Args:
+            normalized_query: Stripped, lowercased query text
+
+        Returns:
+            Optional[QueryRoute]: Cached decision or None on miss
+        """
+        cached = self._route_cache.get(normalized_query)
+        if cached is not None:
+            self._route_cache.move_to_end(normalized_query)
+            return cached.model_copy(deep=True)
+
+        if not self._semantic_cache:
+            return None
+
+        query_vec = self._embed_query(normalized_query)
+        if query_vec is None:
+            return None
+
+        # Vectors are unit-normalized, so cosine similarity is a dot product
+        best_score, best_route = 0.0, None
+        for cached_vec, route in self._semantic_cache:
+            score = sum(a * b for a, b in zip(cached_vec, query_vec))
+            if score > best_score:
+                best_score, best_route = score, route
+
+        if best_route is not None and best_score >= settings.routing_cache_threshold:
+            logger.info(f"Semantic routing-cache hit (score: {best_score:.3f})")
+            return best_route.model_copy(deep=True)
+
+        return None
+
+    def _store_route(
+        self, normalized_query: str, route: QueryRoute, semantic: bool = True
+    ) -> None:
+        """Record a successful routing decision in the cache layers.
+
+        Args:
+            normalized_query: Stripped, lowercased query text
+            route: Routing decision to cache
+            semantic: Also store in the embedding-backed semantic layer.
+                Pass False for heuristic routes - embedding is a network
+                round trip, and the heuristic recomputes its decision in
+                microseconds anyway.
+        """
+        self._route_cache[normalized_query] = route.model_copy(deep=True)
+        if len(self._route_cache) > _ROUTE_CACHE_MAX:
+            self._route_cache.popitem(last=False)
+
+        if not semantic:
+            return
+
+        query_vec = self._embed_query(normalized_query)
+        if query_vec is not None:
+            self._semantic_cache.append((query_vec, route.model_copy(deep=True)))
+
+    def _pre_llm_route(self, query: str, normalized_query: str) -> Optional[QueryRoute]:
+        """Try the cache and heuristic fast paths shared by both route entry points.
+
+        Args:
+            query: Original user query text
+            normalized_query: Stripped, lowercased query text
+
+        Returns:
+            Optional[QueryRoute]: Routing decision if one was reached
+                without an LLM call, else None
+        """
+        # Cached decisions bypass the LLM round trip entirely
+        if settings.enable_routing_cache:
+            cached = self._cached_route(normalized_query)
+            if cached is not None:
+                logger.info(f"Routing cache hit: {cached.query_type.value}")
+                return cached
+
+        # Confident heuristic classifications skip the LLM round trip
+        if settings.heuristic_short_circuit:
+            route, confidence = self._heuristic_route(query)
+            if confidence >= _HEURISTIC_CONFIDENCE:
+                logger.info(
+                    f"Heuristic routed query as {route.query_type.value} "
+                    f"(confidence: {confidence:.2f})"
+                )
+                if settings.enable_routing_cache:
+                    # Exact-match layer only: the semantic layer costs an
+                    # embedding round trip, defeating the point of the
+                    # network-free fast path
+                    self._store_route(normalized_query, route, semantic=False)
+                return route
+
+        return None
+
     def route_query(self, query: str) -> QueryRoute:
         """Route a query to the appropriate strategy.
 
@@ -134,12 +284,15 @@ class QueryRouter:
         """
         logger.info(f"Routing query: {query[:50]}...")
 
-        try:
-            # Get routing decision from LLM
-            response = self.routing_chain.invoke({"query": query})
+        normalized_query = query.strip().translate(_LOWER_TABLE)
+
+        route = self._pre_llm_route(query, normalized_query)
+        if route is not None:
+            return route
 
-            # Parse the response
-            route = self._parse_routing_response(response, query)
+        try:
+            # Get a validated routing decision straight from the LLM
+            route = self.routing_chain.invoke({"query": query})
 
             logger.info(
                 f"Routed query as {route.query_type.value} | "
@@ -147,160 +300,120 @@ class QueryRouter:
                 f"Reasoning: {route.reasoning}"
             )
 
+            if settings.enable_routing_cache:
+                self._store_route(normalized_query, route)
+
             return route
 
         except Exception as e:
             logger.error(f"Error routing query: {e}")
-            # Fallback to simple routing
-            logger.warning("Falling back to SIMPLE routing")
-            return QueryRoute(
-                query_type=QueryType.SIMPLE,
-                reasoning="Fallback due to routing error",
-                metadata_filter=None,
-            )
-
-    def _parse_routing_response(self, response: str, query: str) -> QueryRoute:
-        """Parse the LLM routing response.
-
-        Args:
-            response: Raw LLM response
-            query: Original query for fallback
-
-        Returns:
-            QueryRoute: Parsed routing decision
-        """
-        try:
-            lines = response.strip().split("\n")
-            query_type_str = None
-            reasoning = None
-            metadata_filter = None
-
-            for line in lines:
-                line = line.strip()
-                if line.lower().startswith("type:"):
-                    query_type_str = line.split(":", 1)[1].strip().lower()
-                elif line.lower().startswith("reasoning:"):
-                    reasoning = line.split(":", 1)[1].strip()
-                elif line.lower().startswith("filter:"):
-                    filter_str = line.split(":", 1)[1].strip()
-                    if filter_str and filter_str.lower() != "none":
-                        # Try to parse as dict-like string
-                        metadata_filter = self._parse_filter_string(filter_str)
-
-            # Map query type string to enum
-            query_type = self._map_query_type(query_type_str)
-
-            # Provide default reasoning if none found
-            if not reasoning:
-                reasoning = f"Classified as {query_type.value} query"
-
-            return QueryRoute(
-                query_type=query_type,
-                reasoning=reasoning,
-                metadata_filter=metadata_filter,
-            )
-
-        except Exception as e:
-            logger.error(f"Error parsing routing response: {e}")
-            logger.debug(f"Raw response: {response}")
-
             # Fallback: simple heuristic-based routing
-            return self._heuristic_route(query)
+            logger.warning("Falling back to heuristic routing")
+            return self._heuristic_route(query)[0]
+
+    async def aroute_query(self, query: str) -> QueryRoute:
+        """Async version of route_query.
 
-    def _map_query_type(self, query_type_str: Optional[str]) -> QueryType:
-        """Map query type string to enum.
+        Awaiting the routing LLM call lets callers classify several
+        queries concurrently with asyncio.gather instead of serializing
+        one network round trip per query. Cache and heuristic fast
+        paths are CPU-cheap and stay synchronous.
 
         Args:
-            query_type_str: Query type string from LLM
+            query: User query text
 
         Returns:
-            QueryType: Mapped query type
+            QueryRoute: Routing decision with query type and metadata filter
         """
-        if not query_type_str:
-            return QueryType.SIMPLE
+        logger.info(f"Routing query (async): {query[:50]}...")
 
-        query_type_str = query_type_str.lower().strip()
+        normalized_query = query.strip().translate(_LOWER_TABLE)
 
-        if "cross" in query_type_str or "multi" in query_type_str:
-            return QueryType.CROSS_DOCUMENT
-        elif "aggregation" in query_type_str or "count" in query_type_str:
-            return QueryType.AGGREGATION
-        elif "complex" in query_type_str:
-            return QueryType.COMPLEX
-        else:
-            return QueryType.SIMPLE
+        route = self._pre_llm_route(query, normalized_query)
+        if route is not None:
+            return route
 
-    def _parse_filter_string(self, filter_str: str) -> Optional[Dict[str, str]]:
-        """Parse metadata filter string to dictionary.
+        try:
+            # Get a validated routing decision straight from the LLM
+            route = await self.routing_chain.ainvoke({"query": query})
 
-        Args:
-            filter_str: Filter string (e.g., '{"document_type": "timetable"}')
+            logger.info(
+                f"Routed query as {route.query_type.value} | "
+                f"Filter: {route.metadata_filter} | "
+                f"Reasoning: {route.reasoning}"
+            )
 
-        Returns:
-            Optional[Dict[str, str]]: Parsed filter or None
-        """
-        try:
-            import json
-            # Try to parse as JSON
-            if "{" in filter_str:
-                filter_dict = json.loads(filter_str)
-                return filter_dict
-        except:
-            pass
-
-        # Try to parse simple key:value format
-        try:
-            if ":" in filter_str:
-                parts = filter_str.split(":", 1)
-                key = parts[0].strip().strip('"\'')
-                value = parts[1].strip().strip('"\'')
-                return {key: value}
-        except:
-            pass
+            if settings.enable_routing_cache:
+                self._store_route(normalized_query, route)
 
-        return None
+            return route
 
-    def _heuristic_route(self, query: str) -> QueryRoute:
-        """Fallback heuristic-based routing.
+        except Exception as e:
+            logger.error(f"Error routing query: {e}")
+            # Fallback: simple heuristic-based routing
+            logger.warning("Falling back to heuristic routing")
+            return self._heuristic_route(query)[0]
+
+    def _heuristic_route(self, query: str) -> tuple:
+        """Keyword-based routing with a confidence estimate.
 
         Args:
             query: User query
 
         Returns:
-            QueryRoute: Heuristic routing decision
+            tuple[QueryRoute, float]: Heuristic routing decision and the
+                confidence in it (0.0-1.0); high-confidence decisions can
+                skip LLM routing entirely
         """
-        query_lower = query.lower()
-
-        # Check for aggregation keywords
-        if any(keyword in query_lower for keyword in ["how many", "count", "total", "number of"]):
-            return QueryRoute(
-                query_type=QueryType.AGGREGATION,
-                reasoning="Query contains aggregation keywords",
+        # One scan collects every keyword hit across all groups
+        matched = {m.lastgroup for m in _HEURISTIC_RE.finditer(query)}
+
+        reasons = {
+            QueryType.AGGREGATION: "Query contains aggregation keywords",
+            QueryType.CROSS_DOCUMENT: "Query likely requires multiple documents",
+            QueryType.COMPLEX: "Query requires complex reasoning or tools",
+        }
+
+        # Priority mirrors the original check order
+        for query_type in (QueryType.AGGREGATION, QueryType.CROSS_DOCUMENT, QueryType.COMPLEX):
+            if query_type.value in matched:
+                # One matched group is a confident classification; two or
+                # more pulling different ways ("generate a CSV of all
+                # students" hits both complex and cross_document) is
+                # ambiguity, so stay below the short-circuit threshold
+                # and let the LLM decide
+                confidence = 0.9 if len(matched) == 1 else 0.6
+                return (
+                    QueryRoute(
+                        query_type=query_type,
+                        reasoning=reasons[query_type],
+                        metadata_filter=None,
+                    ),
+                    confidence,
+                )
+
+        # No keyword group matched: that is the low-confidence case, so
+        # stay below the short-circuit threshold and let the LLM route
+        # (and suggest metadata filters, which heuristics never do)
+        confidence = 0.5
+        return (
+            QueryRoute(
+                query_type=QueryType.SIMPLE,
+                reasoning="Simple factual query",
                 metadata_filter=None,
-            )
+            ),
+            confidence,
+        )
 
-        # Check for cross-document keywords
-        if any(keyword in query_lower for keyword in ["all", "which students", "list", "show me"]):
-            return QueryRoute(
-                query_type=QueryType.CROSS_DOCUMENT,
-                reasoning="Query likely requires multiple documents",
-                metadata_filter=None,
-            )
 
-        # Check for complex keywords
-        if any(keyword in query_lower for keyword in ["conflict", "generate", "export", "csv"]):
-            return QueryRoute(
-                query_type=QueryType.COMPLEX,
-                reasoning="Query requires complex reasoning or tools",
-                metadata_filter=None,
-            )
+@lru_cache(maxsize=8)
+def _get_router(model: str | None = None, temperature: float = 0.0) -> QueryRouter:
+    """Get a shared QueryRouter for a (model, temperature) pair.
 
-        # Default to simple
-        return QueryRoute(
-            query_type=QueryType.SIMPLE,
-            reasoning="Simple factual query",
-            metadata_filter=None,
-        )
+    Standalone route_query calls otherwise rebuild the router (prompt,
+    chain, decision caches) per call and lose all cached decisions.
+    """
+    return QueryRouter(model=model, temperature=temperature)
 
 
 def route_query(query: str) -> QueryRoute:
@@ -312,5 +425,4 @@ def route_query(query: str) -> QueryRoute:
     Returns:
         QueryRoute: Routing decision
     """
-    router = QueryRouter()
-    return router.route_query(query)
+    return _get_router().route_query(query)
@@ -4,6 +4,8 @@ This module defines all application settings using Pydantic for validation.
 Settings are loaded from environment variables using python-dotenv.
 """
 
+from functools import lru_cache
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -57,6 +59,36 @@ class Settings(BaseSettings):
         ge=0,
         le=1000
     )
+    loader_cache_enabled: bool = Field(
+        default=True,
+        description="Serve parsed documents from a content-addressed disk cache"
+    )
+    loader_cache_dir: str = Field(
+        default="./data/.loader_cache",
+        description="Directory for cached parsed documents"
+    )
+    split_cache_enabled: bool = Field(
+        default=True,
+        description="Serve chunking results from a content-addressed disk cache"
+    )
+    split_cache_dir: str = Field(
+        default="./data/.split_cache",
+        description="Directory for cached chunking results"
+    )
+    embedding_cache_enabled: bool = Field(
+        default=True,
+        description="Serve document embeddings from a content-hash disk cache"
+    )
+    embedding_cache_path: str = Field(
+        default="./data/.embed_cache.db",
+        description="Path of the on-disk document-embedding cache"
+    )
+    metadata_scan_chars: int = Field(
+        default=4096,
+        description="Content window size scanned for metadata extraction",
+        ge=256,
+        le=65536
+    )
 
     # Retrieval Settings
     top_k_results: int = Field(
@@ -73,6 +105,28 @@ class Settings(BaseSettings):
         ge=1,
         le=100
     )
+    upload_concurrency: int = Field(
+        default=4,
+        description="Maximum number of uploaded files processed concurrently",
+        ge=1,
+        le=32
+    )
+
+    # Query Routing Settings
+    enable_routing_cache: bool = Field(
+        default=True,
+        description="Cache routing decisions to skip repeat LLM routing calls"
+    )
+    routing_cache_threshold: float = Field(
+        default=0.9,
+        description="Minimum cosine similarity for a semantic routing-cache hit",
+        ge=0.5,
+        le=1.0
+    )
+    heuristic_short_circuit: bool = Field(
+        default=True,
+        description="Route confidently classified queries without an LLM call"
+    )
 
     # Model Configuration
     llm_model: str = Field(
@@ -101,14 +155,26 @@ class Settings(BaseSettings):
     )
 
 
-# Global settings instance
-settings = Settings()
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get the global settings instance.
 
+    Construction parses .env from disk, so it is cached: the file is
+    read once per process instead of on every import or reload.
+
     Returns:
         Settings: The application settings
     """
-    return settings
+    return Settings()
+
+
+def __getattr__(name: str):
+    """Lazily expose the module-level ``settings`` instance (PEP 562).
+
+    ``from src.config.settings import settings`` keeps working, but the
+    Settings object (and its .env read) is only built on first access
+    rather than at import time.
+    """
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
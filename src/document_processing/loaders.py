@@ -3,16 +3,81 @@
 This module provides loaders for PDF and text documents using LangChain.
 """
 
+import hashlib
+import itertools
+import mmap
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List
 
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from langchain_community.document_loaders import PyMuPDFLoader, PyPDFLoader, TextLoader
 from langchain_core.documents import Document
 
+from src.config.settings import settings
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Bump when loader behavior changes so stale cache entries are ignored
+_LOADER_CACHE_VERSION = "1"
+
+
+def _cached_load(load_fn):
+    """Serve parsed documents from a content-addressed disk cache.
+
+    Re-ingesting an unchanged file costs a full PDF parse even though the
+    result is deterministic. Keyed on a blake2b hash of the file bytes
+    (plus a loader version), a cache hit is a disk read + unpickle
+    instead of a parse. Cache failures fall through to a normal load.
+    """
+    def wrapper(file_path: Path) -> List[Document]:
+        if not settings.loader_cache_enabled:
+            return load_fn(file_path)
+
+        cache_path = None
+        try:
+            digest = hashlib.blake2b(
+                file_path.read_bytes(), digest_size=16
+            ).hexdigest()
+            cache_path = (
+                Path(settings.loader_cache_dir)
+                / f"{digest}-v{_LOADER_CACHE_VERSION}.pkl"
+            )
+            if cache_path.exists():
+                logger.info(f"Loader cache hit: {file_path.name}")
+                return pickle.loads(cache_path.read_bytes())
+        except Exception as e:
+            logger.warning(f"Loader cache read failed for {file_path.name}: {e}")
+
+        documents = load_fn(file_path)
+
+        if cache_path is not None:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                cache_path.write_bytes(pickle.dumps(documents))
+            except Exception as e:
+                logger.warning(f"Loader cache write failed for {file_path.name}: {e}")
+
+        return documents
+
+    return wrapper
+
+
+def _pdf_loader(file_path: Path):
+    """Build the fastest available PDF loader for a file.
+
+    PyMuPDF's C parser extracts text 5-10x faster than pypdf; fall back
+    to PyPDFLoader when the pymupdf package isn't installed. Both yield
+    Documents with the same page_content/metadata schema.
+    """
+    try:
+        return PyMuPDFLoader(str(file_path))
+    except ImportError:
+        logger.debug("pymupdf not installed, falling back to PyPDFLoader")
+        return PyPDFLoader(str(file_path))
+
 
 class DocumentLoader:
     """Main document loader that handles multiple file types."""
@@ -33,6 +98,40 @@ class DocumentLoader:
             ValueError: If file type is not supported
             FileNotFoundError: If file does not exist
         """
+        file_path, extension, size = cls._validate_file(file_path)
+
+        if size == 0:
+            logger.warning(f"Skipping empty file: {file_path}")
+            return []
+
+        logger.info(f"Loading document: {file_path}")
+
+        if extension == ".pdf":
+            return cls._load_pdf(file_path)
+        elif extension == ".txt":
+            return cls._load_text(file_path)
+        else:
+            raise ValueError(f"Unsupported file type: {extension}")
+
+    @classmethod
+    def _validate_file(cls, file_path: str | Path) -> tuple:
+        """Validate existence, extension and size before any parsing.
+
+        The size guard runs before the file is opened, so an oversized
+        upload is rejected with one stat() call instead of after a full
+        parse attempt.
+
+        Args:
+            file_path: Path to the document file
+
+        Returns:
+            tuple[Path, str, int]: Resolved path, lowercase extension,
+                and file size in bytes
+
+        Raises:
+            ValueError: If file type is not supported or file is too large
+            FileNotFoundError: If file does not exist
+        """
         file_path = Path(file_path)
 
         if not file_path.exists():
@@ -47,16 +146,118 @@ class DocumentLoader:
                 f"Supported types: {cls.SUPPORTED_EXTENSIONS}"
             )
 
-        logger.info(f"Loading document: {file_path}")
+        size = file_path.stat().st_size
+        limit = settings.max_file_size_mb * 1024 * 1024
+        if size > limit:
+            logger.error(f"File too large: {file_path} ({size} bytes)")
+            raise ValueError(
+                f"File {file_path.name} exceeds the "
+                f"{settings.max_file_size_mb} MB limit ({size} bytes)"
+            )
+
+        return file_path, extension, size
+
+    @classmethod
+    def load_documents(
+        cls,
+        file_paths: Iterable[str | Path],
+        max_workers: int | None = None,
+    ) -> List[Document]:
+        """Load a batch of files in parallel, preserving input order.
+
+        Each file parse is independent and PDF parsing spends most of its
+        time in C extension code or I/O, so a thread pool gives near-linear
+        speedup on multi-file upload batches.
+
+        Args:
+            file_paths: Paths of the files to load
+            max_workers: Thread count (default: min(8, cpu count))
+
+        Returns:
+            List[Document]: Documents from all files, in input order
+
+        Raises:
+            ValueError: If any file type is not supported
+            FileNotFoundError: If any file does not exist
+        """
+        file_paths = list(file_paths)
+        if not file_paths:
+            return []
+        if len(file_paths) == 1:
+            return cls.load_document(file_paths[0])
+
+        workers = max_workers or min(8, os.cpu_count() or 1)
+        logger.info(f"Loading {len(file_paths)} files with {workers} workers")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(
+                itertools.chain.from_iterable(
+                    executor.map(cls.load_document, file_paths)
+                )
+            )
+
+    @classmethod
+    def iload_documents(
+        cls,
+        file_paths: Iterable[str | Path],
+        max_workers: int | None = None,
+    ) -> Iterator[Document]:
+        """Stream documents from a batch of files loaded in parallel.
+
+        Like load_documents but yields documents as each file finishes,
+        so the full batch is never resident in memory at once.
+
+        Args:
+            file_paths: Paths of the files to load
+            max_workers: Thread count (default: min(8, cpu count))
+
+        Yields:
+            Document: Documents from each file, in input order
+        """
+        file_paths = list(file_paths)
+        if not file_paths:
+            return
+
+        workers = max_workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for documents in executor.map(cls.load_document, file_paths):
+                yield from documents
+
+    @classmethod
+    def iter_documents(cls, file_path: str | Path) -> Iterator[Document]:
+        """Lazily yield documents from a file one at a time.
+
+        Unlike load_document, this streams pages via the underlying
+        loader's lazy_load, so only one raw document is resident at a
+        time - useful when the caller chunks as it goes.
+
+        Args:
+            file_path: Path to the document file
+
+        Yields:
+            Document: LangChain Document objects, one at a time
+
+        Raises:
+            ValueError: If file type is not supported
+            FileNotFoundError: If file does not exist
+        """
+        file_path, extension, size = cls._validate_file(file_path)
+
+        if size == 0:
+            logger.warning(f"Skipping empty file: {file_path}")
+            return
+
+        logger.info(f"Lazily loading document: {file_path}")
 
         if extension == ".pdf":
-            return cls._load_pdf(file_path)
-        elif extension == ".txt":
-            return cls._load_text(file_path)
+            loader = _pdf_loader(file_path)
         else:
-            raise ValueError(f"Unsupported file type: {extension}")
+            loader = TextLoader(str(file_path), encoding="utf-8")
+
+        yield from loader.lazy_load()
 
     @staticmethod
+    @_cached_load
     def _load_pdf(file_path: Path) -> List[Document]:
         """Load a PDF document.
 
@@ -67,7 +268,7 @@ class DocumentLoader:
             List[Document]: List of Document objects, one per page
         """
         try:
-            loader = PyPDFLoader(str(file_path))
+            loader = _pdf_loader(file_path)
             documents = loader.load()
             logger.info(f"Loaded {len(documents)} pages from PDF: {file_path.name}")
             return documents
@@ -76,9 +277,15 @@ class DocumentLoader:
             raise
 
     @staticmethod
+    @_cached_load
     def _load_text(file_path: Path) -> List[Document]:
         """Load a text document.
 
+        Memory-maps the file and decodes straight from the mapped
+        buffer, so the bytes are copied once (into the final str)
+        instead of twice via an intermediate read() buffer - page cache
+        to string with no duplicate in between.
+
         Args:
             file_path: Path to the text file
 
@@ -86,8 +293,15 @@ class DocumentLoader:
             List[Document]: List containing a single Document object
         """
         try:
-            loader = TextLoader(str(file_path), encoding="utf-8")
-            documents = loader.load()
+            if file_path.stat().st_size == 0:
+                text = ""
+            else:
+                with open(file_path, "rb") as f:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        text = str(memoryview(mm), "utf-8")
+            documents = [
+                Document(page_content=text, metadata={"source": str(file_path)})
+            ]
             logger.info(f"Loaded text file: {file_path.name}")
             return documents
         except Exception as e:
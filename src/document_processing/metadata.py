@@ -7,64 +7,164 @@ This module provides functionality to extract metadata from documents including:
 - Academic year/term
 """
 
+import hashlib
 import re
+from collections import Counter
+from functools import lru_cache
 from typing import Dict, List, Optional
 from langchain_core.documents import Document
 
+from src.config.settings import settings
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-class MetadataExtractor:
-    """Extract metadata from educational documents."""
-
-    # Document type patterns
-    DOCUMENT_TYPE_PATTERNS = {
-        "timetable": [
-            r"timetable",
-            r"schedule",
-            r"class schedule",
-            r"teacher roster",
-            r"\d+:\d+\s*[AP]M",  # Time patterns
-        ],
-        "student_list": [
-            r"student\s+list",
-            r"class\s+roster",
-            r"enrollment",
-            r"student\s+roll",
-        ],
-        "syllabus": [
-            r"syllabus",
-            r"course\s+outline",
-            r"curriculum",
-            r"learning\s+objectives",
-        ],
-        "exam_schedule": [
-            r"exam\s+schedule",
-            r"examination\s+timetable",
-            r"test\s+schedule",
-            r"midterm",
-            r"final\s+exam",
-        ],
-        "advisor_assignment": [
-            r"advisor",
-            r"advise[sd]",
-            r"guidance\s+counselor",
-        ],
+# Raw pattern lists shared by the per-category regexes and the fused
+# single-pass content scan below
+_DOCUMENT_TYPE_PATTERNS = {
+    "timetable": [
+        r"timetable",
+        r"schedule",
+        r"class schedule",
+        r"teacher roster",
+        r"\d+:\d+\s*[AP]M",  # Time patterns
+    ],
+    "student_list": [
+        r"student\s+list",
+        r"class\s+roster",
+        r"enrollment",
+        r"student\s+roll",
+    ],
+    "syllabus": [
+        r"syllabus",
+        r"course\s+outline",
+        r"curriculum",
+        r"learning\s+objectives",
+    ],
+    "exam_schedule": [
+        r"exam\s+schedule",
+        r"examination\s+timetable",
+        r"test\s+schedule",
+        r"midterm",
+        r"final\s+exam",
+    ],
+    "advisor_assignment": [
+        r"advisor",
+        r"advise[sd]",
+        r"guidance\s+counselor",
+    ],
+}
+
+# Grade group names must be identifiers; the canonical hyphenated labels
+# are restored via _GRADE_GROUP_NAMES
+_GRADE_PATTERNS = {
+    "O_Level": [r"o-level", r"o\s+level", r"olevel", r"\bO1\b", r"\bO2\b"],
+    "A_Level": [r"a-level", r"a\s+level", r"alevel", r"\bA1\b", r"\bA2\b"],
+    "Level_I": [r"level-i\b", r"level\s+i\b", r"level\s+1\b"],
+    "Level_II": [r"level-ii\b", r"level\s+ii\b", r"level\s+2\b"],
+    "Level_III": [r"level-iii\b", r"level\s+iii\b", r"level\s+3\b"],
+}
+
+
+# Presence bitmasks for the small fixed grade/section universes: each hit
+# in the scan loops becomes a single integer OR instead of a set insert
+_GRADE_BITS = {
+    "O_Level": 1,
+    "A_Level": 2,
+    "Level_I": 4,
+    "Level_II": 8,
+    "Level_III": 16,
+}
+_SECTION_BITS = {chr(ord("A") + i): 1 << i for i in range(26)}
+
+# Keyword hits needed before a document type is considered resolved; two
+# types both matching twice in the same window is rare in practice
+_DOCTYPE_SCORE_THRESHOLD = 2
+
+
+def _fuse_patterns(raw: Dict[str, List[str]]) -> re.Pattern:
+    """Fuse per-key pattern lists into one alternation regex.
+
+    Each key becomes a named group, so one finditer pass over the
+    content classifies every hit instead of scanning once per pattern.
+    Every branch is wrapped in a zero-width lookahead: a consuming
+    alternation would swallow text that an overlapping later hit needs
+    (e.g. "a level" consuming the "Level" that "level-iii" starts on),
+    silently dropping matches the per-pattern scans found. Keys must be
+    valid group identifiers.
+    """
+    alternation = "|".join(
+        f"(?=(?P<{key}>{'|'.join(patterns)}))" for key, patterns in raw.items()
+    )
+    return re.compile(alternation, re.IGNORECASE)
+
+
+# Document type patterns fused into a single alternation, used for
+# filename classification (match.lastgroup names the type)
+_DOCUMENT_TYPE_RE = _fuse_patterns(_DOCUMENT_TYPE_PATTERNS)
+
+_GRADE_GROUP_NAMES = {
+    "O_Level": "O-Level",
+    "A_Level": "A-Level",
+    "Level_I": "Level-I",
+    "Level_II": "Level-II",
+    "Level_III": "Level-III",
+}
+
+# Every document-type and grade keyword fused into one automaton-style
+# alternation: a single linear pass over the content collects all hits
+# for both categories, with the group-name prefix routing each hit
+_CONTENT_SCAN_RE = _fuse_patterns(
+    {
+        **{f"dt_{key}": patterns for key, patterns in _DOCUMENT_TYPE_PATTERNS.items()},
+        **{f"gr_{key}": patterns for key, patterns in _GRADE_PATTERNS.items()},
     }
+)
+
+# Section patterns
+_SECTION_PATTERN = re.compile(
+    r"section\s+([A-Za-z])|(?:^|\s)([A-Za-z])(?:\s+section)", re.IGNORECASE
+)
+
+# Grade+section combinations like "O1A", "Level-III Section A"
+_GRADE_SECTION_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"o-?level\s+section\s+([A-Z])",
+        r"a-?level\s+section\s+([A-Z])",
+        r"level-?[IVX]+\s+section\s+([A-Z])",
+        r"\b[OA]\d([A-Z])\b",  # O1A, A2B, etc.
+    )
+]
+
+# Academic year patterns
+_YEAR_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"academic\s+year\s*:?\s*(\d{4}[-/]\d{4})",
+        r"year\s*:?\s*(\d{4}[-/]\d{4})",
+        r"(\d{4}[-/]\d{4})\s+academic\s+year",
+        r"semester\s+(\d+)\s+(\d{4})",
+    )
+]
 
-    # Grade level patterns
-    GRADE_PATTERNS = {
-        "O-Level": [r"o-level", r"o\s+level", r"olevel", r"\bO1\b", r"\bO2\b"],
-        "A-Level": [r"a-level", r"a\s+level", r"alevel", r"\bA1\b", r"\bA2\b"],
-        "Level-I": [r"level-i\b", r"level\s+i\b", r"level\s+1\b"],
-        "Level-II": [r"level-ii\b", r"level\s+ii\b", r"level\s+2\b"],
-        "Level-III": [r"level-iii\b", r"level\s+iii\b", r"level\s+3\b"],
-    }
 
-    # Section patterns
-    SECTION_PATTERN = r"section\s+([A-Za-z])|(?:^|\s)([A-Za-z])(?:\s+section)"
+class MetadataExtractor:
+    """Extract metadata from educational documents.
+
+    All patterns live as module-level compiled constants, so methods read
+    them through a plain global lookup instead of class-dict dispatch and
+    the class itself carries only its per-source cache slot.
+    """
+
+    __slots__ = ("_meta_cache",)
+
+    def __init__(self):
+        """Initialize the extractor with an empty per-source cache."""
+        # Extracted metadata per source; chunks split from the same file
+        # yield identical metadata, so re-enrichment skips the regex pass
+        self._meta_cache: Dict[str, Dict[str, str]] = {}
 
     def extract_metadata(
         self, document: Document, filename: Optional[str] = None
@@ -78,158 +178,176 @@ class MetadataExtractor:
         Returns:
             Dictionary containing extracted metadata
         """
-        content = document.page_content.lower()
+        # Distinguishing keywords (titles, headers, grade labels) almost
+        # always appear near the top of a page, so scan a bounded window
+        # first and only fall back to the full content if it yields nothing
+        full_content = document.page_content
+        content = full_content[:settings.metadata_scan_chars]
+
+        metadata = self._extract_all(content, filename)
+        if not metadata and len(full_content) > settings.metadata_scan_chars:
+            logger.debug("Metadata window empty, rescanning full content")
+            metadata = self._extract_all(full_content, filename)
+
+        logger.info(f"Extracted metadata: {metadata}")
+        return metadata
+
+    def _extract_all(
+        self, content: str, filename: Optional[str] = None
+    ) -> Dict[str, str]:
+        """Run every extractor over a content window.
+
+        Args:
+            content: Content window to scan
+            filename: Optional filename for additional context
+
+        Returns:
+            Dictionary containing extracted metadata
+        """
         metadata = {}
 
-        # Extract document type
-        doc_type = self._extract_document_type(content, filename)
+        # One linear pass over the content collects every document-type
+        # and grade keyword hit; the group-name prefix routes each match
+        type_scores: Counter = Counter()
+        resolved_type = None
+        grade_mask = 0
+        for match in _CONTENT_SCAN_RE.finditer(content):
+            group = match.lastgroup
+            if group.startswith("dt_"):
+                # First type to reach the threshold wins; later hits no
+                # longer need scoring (the scan continues for grades)
+                if resolved_type is None:
+                    doc_type = group[3:]
+                    type_scores[doc_type] += 1
+                    if type_scores[doc_type] >= _DOCTYPE_SCORE_THRESHOLD:
+                        resolved_type = doc_type
+            else:
+                grade_mask |= _GRADE_BITS[group[3:]]
+
+        # Extract document type (filename takes precedence over content)
+        doc_type = self._document_type_from_scores(
+            type_scores, filename, resolved_type
+        )
         if doc_type:
             metadata["document_type"] = doc_type
-            logger.debug(f"Extracted document type: {doc_type}")
+            logger.debug("Extracted document type: %s", doc_type)
 
-        # Extract grade levels (can have multiple)
-        grade_levels = self._extract_grade_levels(content)
+        # Extract grade levels (can have multiple) - decode the mask
+        grade_levels = sorted(
+            _GRADE_GROUP_NAMES[group]
+            for group, bit in _GRADE_BITS.items()
+            if grade_mask & bit
+        )
         if grade_levels:
             metadata["grade_levels"] = ",".join(grade_levels)
-            logger.debug(f"Extracted grade levels: {grade_levels}")
+            logger.debug("Extracted grade levels: %s", grade_levels)
 
         # Extract sections
         sections = self._extract_sections(content)
         if sections:
             metadata["sections"] = ",".join(sections)
-            logger.debug(f"Extracted sections: {sections}")
+            logger.debug("Extracted sections: %s", sections)
 
         # Extract academic year if present
         academic_year = self._extract_academic_year(content)
         if academic_year:
             metadata["academic_year"] = academic_year
-            logger.debug(f"Extracted academic year: {academic_year}")
+            logger.debug("Extracted academic year: %s", academic_year)
 
-        logger.info(f"Extracted metadata: {metadata}")
         return metadata
 
-    def _extract_document_type(
-        self, content: str, filename: Optional[str] = None
+    def _document_type_from_scores(
+        self,
+        type_scores: Counter,
+        filename: Optional[str] = None,
+        resolved_type: Optional[str] = None,
     ) -> Optional[str]:
-        """Extract document type from content and filename.
+        """Pick the document type from content scores and filename.
 
         Args:
-            content: Document content (lowercase)
+            type_scores: Per-type keyword hit counts from the content scan
             filename: Optional filename
+            resolved_type: Type that reached the score threshold mid-scan
 
         Returns:
             Document type or None
         """
         # Check filename first if available
         if filename:
-            filename_lower = filename.lower()
-            for doc_type, patterns in self.DOCUMENT_TYPE_PATTERNS.items():
-                for pattern in patterns:
-                    if re.search(pattern, filename_lower):
-                        return doc_type
-
-        # Check content
-        type_scores = {}
-        for doc_type, patterns in self.DOCUMENT_TYPE_PATTERNS.items():
-            score = 0
-            for pattern in patterns:
-                matches = re.findall(pattern, content)
-                score += len(matches)
-            if score > 0:
-                type_scores[doc_type] = score
+            match = _DOCUMENT_TYPE_RE.search(filename)
+            if match:
+                return match.lastgroup
+
+        if resolved_type:
+            return resolved_type
 
         if type_scores:
             # Return the type with highest score
-            return max(type_scores.items(), key=lambda x: x[1])[0]
+            return type_scores.most_common(1)[0][0]
 
         return None
 
-    def _extract_grade_levels(self, content: str) -> List[str]:
-        """Extract grade levels from content.
-
-        Args:
-            content: Document content (lowercase)
-
-        Returns:
-            List of grade levels found
-        """
-        grade_levels = set()
-
-        for grade, patterns in self.GRADE_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, content, re.IGNORECASE):
-                    grade_levels.add(grade)
-                    break  # Only need one match per grade
-
-        return sorted(list(grade_levels))
-
     def _extract_sections(self, content: str) -> List[str]:
         """Extract sections from content.
 
         Args:
-            content: Document content (lowercase)
+            content: Document content
 
         Returns:
             List of sections found (A, B, C, etc.)
         """
-        sections = set()
+        section_mask = 0
 
         # Find all section mentions
-        matches = re.finditer(self.SECTION_PATTERN, content, re.IGNORECASE)
-        for match in matches:
+        for match in _SECTION_PATTERN.finditer(content):
             section = (match.group(1) or match.group(2)).upper()
             if section and section.isalpha() and len(section) == 1:
-                sections.add(section)
+                section_mask |= _SECTION_BITS[section]
 
         # Also look for patterns like "O1A", "Level-III A"
-        grade_section_patterns = [
-            r"o-?level\s+section\s+([A-Z])",
-            r"a-?level\s+section\s+([A-Z])",
-            r"level-?[IVX]+\s+section\s+([A-Z])",
-            r"\b[OA]\d([A-Z])\b",  # O1A, A2B, etc.
-        ]
-
-        for pattern in grade_section_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
+        for pattern in _GRADE_SECTION_PATTERNS:
+            for match in pattern.finditer(content):
                 section = match.group(1).upper()
                 if section.isalpha() and len(section) == 1:
-                    sections.add(section)
+                    section_mask |= _SECTION_BITS[section]
 
-        return sorted(list(sections))
+        # _SECTION_BITS iterates A..Z, so decoding is already sorted
+        return [
+            section for section, bit in _SECTION_BITS.items() if section_mask & bit
+        ]
 
     def _extract_academic_year(self, content: str) -> Optional[str]:
         """Extract academic year from content.
 
         Args:
-            content: Document content (lowercase)
+            content: Document content
 
         Returns:
             Academic year string or None
         """
-        # Look for year patterns
-        year_patterns = [
-            r"academic\s+year\s*:?\s*(\d{4}[-/]\d{4})",
-            r"year\s*:?\s*(\d{4}[-/]\d{4})",
-            r"(\d{4}[-/]\d{4})\s+academic\s+year",
-            r"semester\s+(\d+)\s+(\d{4})",
-        ]
-
-        for pattern in year_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
+        for pattern in _YEAR_PATTERNS:
+            match = pattern.search(content)
             if match:
                 return match.group(1)
 
         return None
 
     def enrich_documents(
-        self, documents: List[Document], filename: Optional[str] = None
+        self,
+        documents: List[Document],
+        filename: Optional[str] = None,
+        copy: bool = False,
     ) -> List[Document]:
         """Enrich documents with extracted metadata.
 
+        By default the existing metadata dicts are updated in place,
+        avoiding a dict merge and Document reconstruction per chunk; pass
+        copy=True to get fresh Document objects instead.
+
         Args:
             documents: List of documents to enrich
             filename: Optional filename for context
+            copy: Build new Document objects instead of mutating in place
 
         Returns:
             List of documents with enriched metadata
@@ -238,24 +356,35 @@ class MetadataExtractor:
             return documents
 
         # Extract metadata from first document (assumed to be representative)
-        # For chunked documents, the metadata applies to all chunks
-        extracted_metadata = self.extract_metadata(documents[0], filename)
-
-        # Add extracted metadata to all documents
-        enriched_docs = []
-        for doc in documents:
-            # Merge existing metadata with extracted metadata
-            new_metadata = {**doc.metadata, **extracted_metadata}
-
-            # Add source filename if provided
-            if filename:
-                new_metadata["source"] = filename
-
-            # Create new document with enriched metadata
-            enriched_doc = Document(
-                page_content=doc.page_content, metadata=new_metadata
-            )
-            enriched_docs.append(enriched_doc)
+        # For chunked documents, the metadata applies to all chunks; cache
+        # per source so split-then-enrich pipelines extract once per file
+        cache_key = filename or hashlib.blake2b(
+            documents[0].page_content[:4096].encode("utf-8"), digest_size=16
+        ).hexdigest()
+        extracted_metadata = self._meta_cache.get(cache_key)
+        if extracted_metadata is None:
+            extracted_metadata = self.extract_metadata(documents[0], filename)
+            self._meta_cache[cache_key] = extracted_metadata
+
+        if copy:
+            enriched_docs = [
+                Document(
+                    page_content=doc.page_content,
+                    metadata={
+                        **doc.metadata,
+                        **extracted_metadata,
+                        **({"source": filename} if filename else {}),
+                    },
+                )
+                for doc in documents
+            ]
+        else:
+            # Mutate the metadata already attached to each chunk
+            for doc in documents:
+                doc.metadata.update(extracted_metadata)
+                if filename:
+                    doc.metadata["source"] = filename
+            enriched_docs = documents
 
         logger.info(
             f"Enriched {len(enriched_docs)} documents with metadata: {extracted_metadata}"
@@ -263,6 +392,19 @@ class MetadataExtractor:
         return enriched_docs
 
 
+@lru_cache(maxsize=1)
+def get_extractor() -> MetadataExtractor:
+    """Get the shared process-wide MetadataExtractor.
+
+    Sharing one instance keeps its per-source metadata cache effective
+    across repeated enrichment calls.
+
+    Returns:
+        MetadataExtractor: Shared extractor instance
+    """
+    return MetadataExtractor()
+
+
 def extract_metadata_from_documents(
     documents: List[Document], filename: Optional[str] = None
 ) -> List[Document]:
@@ -275,5 +417,4 @@ def extract_metadata_from_documents(
     Returns:
         List of documents with enriched metadata
     """
-    extractor = MetadataExtractor()
-    return extractor.enrich_documents(documents, filename)
+    return get_extractor().enrich_documents(documents, filename)
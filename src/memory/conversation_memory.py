@@ -4,6 +4,8 @@ This module provides memory management for chat sessions, allowing the system
 to maintain conversation history and context.
 """
 
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Optional
 from datetime import datetime
 
@@ -20,6 +22,16 @@ logger = get_logger(__name__)
 class SessionMemoryManager:
     """Manages conversation memory for chat sessions."""
 
+    # One instance per active session: slots drop the per-instance
+    # __dict__, shrinking each session and speeding attribute access
+    __slots__ = (
+        "session_id",
+        "memory_type",
+        "max_token_limit",
+        "created_at",
+        "chat_history",
+    )
+
     def __init__(
         self,
         session_id: str,
@@ -53,7 +65,7 @@ class SessionMemoryManager:
             message: User's message content
         """
         self.chat_history.add_message(HumanMessage(content=message))
-        logger.debug(f"Added user message to session {self.session_id}")
+        logger.debug("Added user message to session %s", self.session_id)
 
     def add_ai_message(self, message: str) -> None:
         """Add an AI response to memory.
@@ -62,7 +74,7 @@ class SessionMemoryManager:
             message: AI's response content
         """
         self.chat_history.add_message(AIMessage(content=message))
-        logger.debug(f"Added AI message to session {self.session_id}")
+        logger.debug("Added AI message to session %s", self.session_id)
 
     def add_exchange(self, user_message: str, ai_message: str) -> None:
         """Add a complete conversation exchange.
@@ -74,34 +86,36 @@ class SessionMemoryManager:
         self.add_user_message(user_message)
         self.add_ai_message(ai_message)
 
+    def _iter_messages(self):
+        """Yield (role, content) pairs in one pass over stored messages."""
+        for msg in self.chat_history.messages:
+            role = 'user' if isinstance(msg, HumanMessage) else 'assistant'
+            yield role, msg.content
+
     def get_history(self) -> List[Dict[str, str]]:
         """Get conversation history.
 
         Returns:
             List of message dictionaries with 'role' and 'content'
         """
-        messages = self.chat_history.messages
-        history = []
-        for msg in messages:
-            role = 'user' if isinstance(msg, HumanMessage) else 'assistant'
-            history.append({
-                'role': role,
-                'content': msg.content
-            })
-        return history
+        return [
+            {'role': role, 'content': content}
+            for role, content in self._iter_messages()
+        ]
 
     def get_context(self) -> str:
         """Get conversation context as a formatted string.
 
+        Formats directly from the stored messages in a single pass, so
+        long sessions skip the intermediate list of history dicts.
+
         Returns:
             Formatted conversation history
         """
-        history = self.get_history()
-        context_lines = []
-        for msg in history:
-            role = msg['role'].capitalize()
-            context_lines.append(f"{role}: {msg['content']}")
-        return "\n".join(context_lines)
+        return "\n".join(
+            f"{'User' if role == 'user' else 'Assistant'}: {content}"
+            for role, content in self._iter_messages()
+        )
 
     def clear(self) -> None:
         """Clear conversation memory."""
@@ -132,11 +146,25 @@ class SessionMemoryManager:
 
 
 class MultiSessionMemoryManager:
-    """Manages memory for multiple concurrent sessions."""
+    """Manages memory for multiple concurrent sessions.
+
+    Sessions are kept in an LRU-capped OrderedDict so a long-running
+    process cannot retain every session's buffer forever: once
+    max_sessions is reached, the least recently used session is evicted
+    on insert.
+    """
 
-    def __init__(self):
-        """Initialize multi-session memory manager."""
-        self.sessions: Dict[str, SessionMemoryManager] = {}
+    __slots__ = ("sessions", "max_sessions")
+
+    def __init__(self, max_sessions: int = 10_000):
+        """Initialize multi-session memory manager.
+
+        Args:
+            max_sessions: Maximum number of sessions retained before
+                LRU eviction kicks in
+        """
+        self.sessions: OrderedDict[str, SessionMemoryManager] = OrderedDict()
+        self.max_sessions = max_sessions
         logger.info("Initialized MultiSessionMemoryManager")
 
     def get_or_create_session(
@@ -155,14 +183,23 @@ class MultiSessionMemoryManager:
         Returns:
             SessionMemoryManager for the session
         """
-        if session_id not in self.sessions:
-            self.sessions[session_id] = SessionMemoryManager(
-                session_id=session_id,
-                memory_type=memory_type,
-                max_token_limit=max_token_limit,
-            )
-            logger.info(f"Created new session: {session_id}")
-        return self.sessions[session_id]
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self.sessions.move_to_end(session_id)
+            return session
+
+        if len(self.sessions) >= self.max_sessions:
+            evicted_id, _ = self.sessions.popitem(last=False)
+            logger.info(f"Evicted least recently used session: {evicted_id}")
+
+        session = SessionMemoryManager(
+            session_id=session_id,
+            memory_type=memory_type,
+            max_token_limit=max_token_limit,
+        )
+        self.sessions[session_id] = session
+        logger.info(f"Created new session: {session_id}")
+        return session
 
     def get_session(self, session_id: str) -> Optional[SessionMemoryManager]:
         """Get existing session memory.
@@ -173,7 +210,10 @@ class MultiSessionMemoryManager:
         Returns:
             SessionMemoryManager if exists, None otherwise
         """
-        return self.sessions.get(session_id)
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self.sessions.move_to_end(session_id)
+        return session
 
     def delete_session(self, session_id: str) -> bool:
         """Delete a session.
@@ -213,17 +253,14 @@ class MultiSessionMemoryManager:
         return [session.get_stats() for session in self.sessions.values()]
 
 
-# Global instance for the application
-_global_memory_manager: Optional[MultiSessionMemoryManager] = None
-
-
+@lru_cache(maxsize=1)
 def get_memory_manager() -> MultiSessionMemoryManager:
     """Get or create the global memory manager.
 
+    Lazily built on first use and cached, so importing this module
+    never constructs the manager.
+
     Returns:
         MultiSessionMemoryManager instance
     """
-    global _global_memory_manager
-    if _global_memory_manager is None:
-        _global_memory_manager = MultiSessionMemoryManager()
-    return _global_memory_manager
+    return MultiSessionMemoryManager()
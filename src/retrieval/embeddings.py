@@ -3,8 +3,16 @@
 This module provides embeddings functionality for converting text to vectors.
 """
 
-from typing import List
+import asyncio
+import hashlib
+import math
+import shelve
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
 
+import numpy as np
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
 
 from src.config.settings import settings
@@ -12,6 +20,275 @@ from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Batching defaults for document embedding: ~100 texts per request keeps
+# each call well under API limits, and a handful of in-flight requests
+# overlaps round-trip latency instead of serializing on it
+_EMBED_BATCH_SIZE = 96
+_EMBED_MAX_CONCURRENCY = 8
+
+# Token budget per embedding request, comfortably under the API's
+# per-request token limit so no batch is rejected and retried
+_EMBED_MAX_TOKENS_PER_BATCH = 100_000
+
+
+@lru_cache(maxsize=4)
+def _get_encoder(model: str):
+    """Get a cached tiktoken encoder for a model.
+
+    Encoder construction loads the BPE vocabulary from disk, so it is
+    cached per model rather than rebuilt per batching call.
+    """
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def _batch_by_tokens(
+    texts: List[str],
+    max_tokens: int = _EMBED_MAX_TOKENS_PER_BATCH,
+    model: str | None = None,
+) -> List[List[str]]:
+    """Group texts into batches bounded by a token budget.
+
+    A batch is flushed when adding the next text would overflow the
+    budget, *before* that text is appended; completed batches are stored
+    and the working list is rebound (never cleared in place), so no
+    batch is silently lost and no over-budget request is ever sent.
+
+    Args:
+        texts: Text strings to batch
+        max_tokens: Maximum total tokens per batch
+        model: Model name used to pick the tokenizer (default: from settings)
+
+    Returns:
+        List[List[str]]: Batches of texts, each within the token budget
+    """
+    encoder = _get_encoder(model or settings.embedding_model)
+
+    batches: List[List[str]] = []
+    batch: List[str] = []
+    batch_tokens = 0
+
+    for text in texts:
+        n_tokens = len(encoder.encode(text))
+        if batch_tokens + n_tokens > max_tokens and batch:
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(text)
+        batch_tokens += n_tokens
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+@lru_cache(maxsize=4)
+def _get_query_embedder(model: str) -> OpenAIEmbeddings:
+    """Get a shared OpenAIEmbeddings client for query embedding."""
+    return OpenAIEmbeddings(
+        model=model,
+        openai_api_key=settings.openai_api_key,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _embed_query_cached(model: str, normalized_text: str) -> Tuple[float, ...]:
+    """Embed a normalized query, caching results across manager instances.
+
+    Queries repeat heavily within a session (follow-ups, retries), and
+    each repeat otherwise costs an API round trip. Module scope means
+    the cache survives EmbeddingsManager re-instantiation; a cached
+    1536-d vector is ~12 KB, so the full cache is a few MB at most.
+    """
+    return tuple(_get_query_embedder(model).embed_query(normalized_text))
+
+
+def _l2_normalize(vector: List[float]) -> List[float]:
+    """Scale a vector to unit L2 norm (zero vectors pass through)."""
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return list(vector)
+    return [v / norm for v in vector]
+
+
+class NormalizedEmbeddings(Embeddings):
+    """Embeddings wrapper that L2-normalizes every vector it returns.
+
+    With both document and query vectors normalized once at embed time,
+    the index can rank by plain inner product instead of cosine: the
+    per-comparison norm computation (and its sqrt) drops out of the
+    search inner loop. Downstream code must not re-normalize.
+    """
+
+    def __init__(self, embeddings: Embeddings):
+        """Initialize the normalizing wrapper.
+
+        Args:
+            embeddings: Underlying embeddings instance to delegate to
+        """
+        self._embeddings = embeddings
+
+    def embed_query(self, text: str) -> List[float]:
+        """Generate a unit-norm embedding for a query.
+
+        Args:
+            text: Query text to embed
+
+        Returns:
+            List[float]: Unit-norm embedding vector
+        """
+        return _l2_normalize(self._embeddings.embed_query(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Generate unit-norm embeddings for documents.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List[List[float]]: List of unit-norm embedding vectors
+        """
+        return [
+            _l2_normalize(vector)
+            for vector in self._embeddings.embed_documents(texts)
+        ]
+
+
+class PersistentEmbeddingCache(Embeddings):
+    """Embeddings wrapper with an on-disk (content hash -> vector) cache.
+
+    Re-ingesting unchanged content - most visibly the phase test
+    scripts, which rebuild a fresh collection from the same sample file
+    on every run - otherwise re-pays the full embedding API cost for
+    text that was already embedded. Keyed on a sha256 of each text,
+    only cache misses go to the API; hits are a local disk read. Cache
+    failures fall through to a normal embedding call.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache_path: str | None = None):
+        """Initialize the persistent cache.
+
+        Args:
+            embeddings: Underlying embeddings instance to delegate to
+            cache_path: Cache file location (default: from settings)
+        """
+        self._embeddings = embeddings
+        self._cache_path = str(Path(cache_path or settings.embedding_cache_path))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings, serving repeats from the disk cache.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List[List[float]]: List of embedding vectors, in input order
+        """
+        if not settings.embedding_cache_enabled or not texts:
+            return self._embeddings.embed_documents(texts)
+
+        keys = [
+            hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts
+        ]
+        vectors: List = [None] * len(texts)
+        missing = list(range(len(texts)))
+
+        try:
+            Path(self._cache_path).parent.mkdir(parents=True, exist_ok=True)
+            with shelve.open(self._cache_path) as cache:
+                missing = []
+                for i, key in enumerate(keys):
+                    cached = cache.get(key)
+                    if cached is None:
+                        missing.append(i)
+                    else:
+                        vectors[i] = cached
+        except Exception as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+
+        if len(missing) < len(texts):
+            logger.info(
+                f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} hits"
+            )
+        if missing:
+            new_vectors = self._embeddings.embed_documents(
+                [texts[i] for i in missing]
+            )
+            for i, vector in zip(missing, new_vectors):
+                vectors[i] = vector
+            try:
+                with shelve.open(self._cache_path) as cache:
+                    for i in missing:
+                        cache[keys[i]] = vectors[i]
+            except Exception as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        """Generate an embedding for a query (not disk-cached).
+
+        Args:
+            text: Query text to embed
+
+        Returns:
+            List[float]: Embedding vector
+        """
+        return self._embeddings.embed_query(text)
+
+
+class QueryEmbeddingCache(Embeddings):
+    """Embeddings wrapper that caches query embeddings in-process.
+
+    Query distributions are highly non-uniform: users repeat and re-ask
+    the same questions, and every repeat otherwise pays a full embedding
+    API round trip. Wrapping ``embed_query`` with an LRU cache removes
+    that round trip for cached queries. Document embedding is passed
+    through unchanged.
+    """
+
+    def __init__(self, embeddings: Embeddings, maxsize: int = 2048):
+        """Initialize the caching wrapper.
+
+        Args:
+            embeddings: Underlying embeddings instance to delegate to
+            maxsize: Maximum number of cached query embeddings
+        """
+        self._embeddings = embeddings
+        self._cached_embed_query = lru_cache(maxsize=maxsize)(self._embed_query_uncached)
+        logger.info(f"Initialized QueryEmbeddingCache with maxsize={maxsize}")
+
+    def _embed_query_uncached(self, text: str) -> Tuple[float, ...]:
+        """Embed a query via the underlying instance (tuple so it's cacheable)."""
+        return tuple(self._embeddings.embed_query(text))
+
+    def embed_query(self, text: str) -> List[float]:
+        """Generate (or fetch from cache) an embedding for a query.
+
+        Args:
+            text: Query text to embed
+
+        Returns:
+            List[float]: Embedding vector
+        """
+        return list(self._cached_embed_query(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for documents (not cached).
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List[List[float]]: List of embedding vectors
+        """
+        return self._embeddings.embed_documents(texts)
+
 
 class EmbeddingsManager:
     """Manager for generating embeddings using OpenAI."""
@@ -27,27 +304,130 @@ class EmbeddingsManager:
         self.embeddings = OpenAIEmbeddings(
             model=self.model,
             openai_api_key=settings.openai_api_key,
+            # Bound the batch size of a single embed_documents call so the
+            # client never assembles one oversized request
+            chunk_size=_EMBED_BATCH_SIZE,
         )
 
         logger.info(f"Initialized EmbeddingsManager with model: {self.model}")
 
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def embed_documents(
+        self, texts: List[str], return_numpy: bool = True
+    ) -> "np.ndarray | List[List[float]]":
         """Generate embeddings for a list of documents.
 
+        Large batches are embedded with several requests in flight at
+        once (see aembed_documents); when called from inside a running
+        event loop, falls back to the client's sequential batching.
+
+        By default the vectors come back as one contiguous float32
+        array of shape (N, d): ~7x smaller than nested lists of boxed
+        Python floats and directly usable by numpy/FAISS kernels with
+        no conversion copy.
+
         Args:
             texts: List of text strings to embed
+            return_numpy: Return a float32 ndarray (default); pass False
+                for a plain list of lists
 
         Returns:
-            List[List[float]]: List of embedding vectors
+            np.ndarray | List[List[float]]: Embedding vectors, shape (N, d)
 
         Example:
             >>> manager = EmbeddingsManager()
             >>> embeddings = manager.embed_documents(["Text 1", "Text 2"])
-            >>> print(f"Generated {len(embeddings)} embeddings")
+            >>> print(f"Generated {embeddings.shape[0]} embeddings")
         """
         try:
-            logger.debug(f"Generating embeddings for {len(texts)} documents")
-            vectors = self.embeddings.embed_documents(texts)
+            logger.debug("Generating embeddings for %d documents", len(texts))
+            vectors = None
+            if len(texts) > _EMBED_BATCH_SIZE:
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    # No running loop: drive the concurrent path ourselves
+                    vectors = asyncio.run(self.aembed_documents(texts))
+            if vectors is None:
+                vectors = self.embeddings.embed_documents(texts)
+            logger.info(f"Successfully generated {len(vectors)} embeddings")
+            if return_numpy:
+                return np.asarray(vectors, dtype=np.float32)
+            return vectors
+        except Exception as e:
+            logger.error(f"Error generating document embeddings: {e}")
+            raise
+
+    async def aembed_documents(
+        self,
+        texts: List[str],
+        batch_size: int = _EMBED_BATCH_SIZE,
+        max_concurrency: int = _EMBED_MAX_CONCURRENCY,
+    ) -> List[List[float]]:
+        """Generate embeddings for documents with concurrent batches.
+
+        Embedding is network-bound, so sharding the texts into batches
+        and keeping several requests in flight overlaps round trips
+        instead of paying one RTT per batch in sequence. Results are
+        flattened back in input order.
+
+        Args:
+            texts: List of text strings to embed
+            batch_size: Number of texts per API request
+            max_concurrency: Maximum number of requests in flight
+
+        Returns:
+            List[List[float]]: List of embedding vectors, in input order
+        """
+        if not texts:
+            return []
+
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self.embeddings.aembed_documents(batch)
+
+        logger.debug(
+            "Embedding %d documents in %d batches (concurrency: %d)",
+            len(texts), len(batches), max_concurrency,
+        )
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+
+        # gather preserves task order, so flattening restores input order
+        return [vector for batch_vectors in results for vector in batch_vectors]
+
+    def embed_documents_by_tokens(
+        self,
+        texts: List[str],
+        max_tokens: int = _EMBED_MAX_TOKENS_PER_BATCH,
+    ) -> List[List[float]]:
+        """Generate embeddings with batches bounded by token count.
+
+        Count-based batching can still overflow the API's per-request
+        token limit when chunks are long; batching on actual token
+        counts keeps every request under budget, so none is rejected
+        and retried.
+
+        Args:
+            texts: List of text strings to embed
+            max_tokens: Maximum total tokens per API request
+
+        Returns:
+            List[List[float]]: List of embedding vectors, in input order
+        """
+        if not texts:
+            return []
+
+        try:
+            batches = _batch_by_tokens(texts, max_tokens, self.model)
+            logger.debug(
+                "Embedding %d documents in %d token-bounded batches",
+                len(texts), len(batches),
+            )
+            vectors: List[List[float]] = []
+            for batch in batches:
+                vectors.extend(self.embeddings.embed_documents(batch))
             logger.info(f"Successfully generated {len(vectors)} embeddings")
             return vectors
         except Exception as e:
@@ -69,8 +449,11 @@ class EmbeddingsManager:
             >>> print(f"Embedding dimension: {len(embedding)}")
         """
         try:
-            logger.debug(f"Generating embedding for query: {text[:50]}...")
-            vector = self.embeddings.embed_query(text)
+            logger.debug("Generating embedding for query: %.50s...", text)
+            # Whitespace/case normalization folds trivial rephrasings onto
+            # one cache entry before the LRU lookup
+            normalized = " ".join(text.split()).casefold()
+            vector = list(_embed_query_cached(self.model, normalized))
             logger.info("Successfully generated query embedding")
             return vector
         except Exception as e:
@@ -10,6 +10,16 @@ from typing import Optional
 
 from src.config.settings import settings
 
+# One formatter and one console handler shared by every logger: each
+# get_logger call attaches references instead of rebuilding both objects
+# per module at import time
+_FORMATTER = logging.Formatter(
+    fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+_CONSOLE_HANDLER = logging.StreamHandler(sys.stdout)
+_CONSOLE_HANDLER.setFormatter(_FORMATTER)
+
 
 def setup_logging(
     name: str = "edudicai",
@@ -41,17 +51,8 @@ def setup_logging(
     # Remove existing handlers to avoid duplicates
     logger.handlers.clear()
 
-    # Create formatter
-    formatter = logging.Formatter(
-        fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    # Shared console handler (level is controlled by the logger)
+    logger.addHandler(_CONSOLE_HANDLER)
 
     # File handler (optional)
     if log_file:
@@ -60,7 +61,7 @@ def setup_logging(
 
         file_handler = logging.FileHandler(log_path, encoding="utf-8")
         file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
+        file_handler.setFormatter(_FORMATTER)
         logger.addHandler(file_handler)
 
     # Prevent propagation to root logger
@@ -84,9 +85,12 @@ def get_logger(name: str) -> logging.Logger:
     """
     logger = logging.getLogger(name)
 
-    # Only setup if logger has no handlers
+    # First use: attach the shared handler instead of running the full
+    # setup_logging path per module
     if not logger.handlers:
-        return setup_logging(name)
+        logger.addHandler(_CONSOLE_HANDLER)
+        logger.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+        logger.propagate = False
 
     return logger
 